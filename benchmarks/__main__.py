@@ -0,0 +1,55 @@
+import argparse
+import sys
+
+from .runner import compare, load, run_benchmarks, save
+from .suite import BENCHMARKS, BY_NAME
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Times kleeneup operations on generated automata.')
+    parser.add_argument('names', nargs='*', metavar='benchmark',
+                        help='benchmarks to run (default: all of {})'.format(
+                            ', '.join(BY_NAME)))
+    parser.add_argument('-o', '--out', help='file to write the results to')
+    parser.add_argument('-c', '--compare', metavar='FILE',
+                        help='previous results to check for regressions')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='slowdown ratio reported as a regression')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--quick', action='store_true',
+                        help='run only the smallest sizes')
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.names if name not in BY_NAME]
+    if unknown:
+        parser.error('unknown benchmark(s): {}'.format(', '.join(unknown)))
+
+    benchmarks = [BY_NAME[name] for name in args.names] or BENCHMARKS
+
+    def progress(result):
+        print('{benchmark:>14} {size:>8}  {min_seconds:10.4f}s  '
+              '{peak_bytes:>12,} B'.format(**result), file=sys.stderr)
+
+    results = run_benchmarks(benchmarks, seed=args.seed, repeat=args.repeat,
+                             quick=args.quick, progress=progress)
+
+    if args.out:
+        save(results, args.out)
+
+    if args.compare:
+        regressions = compare(load(args.compare), results, args.threshold)
+
+        for r in regressions:
+            print('regression: {benchmark} size {size} {metric} '
+                  '{before:.4g} -> {after:.4g}'.format(**r), file=sys.stderr)
+
+        if regressions:
+            return 1
+
+    return 0
+
+
+sys.exit(main())
@@ -0,0 +1,112 @@
+from random import Random
+from string import ascii_lowercase, digits
+from typing import List
+
+from kleeneup import FiniteAutomaton, State, Symbol
+
+SYMBOLS = digits + ascii_lowercase
+
+
+def alphabet(size: int) -> List[Symbol]:
+    """Retorna os primeiros símbolos aceitos em expressões regulares.
+
+    Parâmetros:
+    size -- número de símbolos (no máximo 36)
+    """
+    if not 0 < size <= len(SYMBOLS):
+        raise ValueError('alphabet size must be between 1 and {}'.format(
+            len(SYMBOLS)))
+
+    return [Symbol(c) for c in SYMBOLS[:size]]
+
+
+def random_nfa(rng: Random, states: int, symbols: int, density: float,
+               epsilon: float = 0.0) -> FiniteAutomaton:
+    """Retorna um autômato finito não determinístico aleatório.
+
+    Parâmetros:
+    rng     -- gerador de números aleatórios
+    states  -- número de estados
+    symbols -- tamanho do alfabeto
+    density -- probabilidade de cada transição (estado, símbolo, estado)
+    epsilon -- probabilidade de cada transição por & (padrão 0)
+    """
+    names = [State('Q{}'.format(i)) for i in range(states)]
+    sigma = alphabet(symbols)
+    fa = FiniteAutomaton({}, names[0], ())
+    fa.states.update(names)
+    fa.alphabet.update(sigma)
+
+    for source in names:
+        for symbol in sigma:
+            for target in names:
+                if rng.random() < density:
+                    fa.add_transition(source, symbol, target)
+
+        if epsilon:
+            for target in names:
+                if target != source and rng.random() < epsilon:
+                    fa.add_transition(source, Symbol('&'), target)
+
+    fa.accept_states = {state for state in names if rng.random() < 0.3}
+    fa.accept_states.add(rng.choice(names))
+
+    return fa
+
+
+def random_dfa(rng: Random, states: int, symbols: int,
+               density: float = 1.0) -> FiniteAutomaton:
+    """Retorna um autômato finito determinístico aleatório.
+
+    Parâmetros:
+    rng     -- gerador de números aleatórios
+    states  -- número de estados
+    symbols -- tamanho do alfabeto
+    density -- probabilidade de cada estado ter transição por cada símbolo
+               (padrão 1, autômato completo)
+    """
+    names = [State('Q{}'.format(i)) for i in range(states)]
+    sigma = alphabet(symbols)
+    fa = FiniteAutomaton({}, names[0], ())
+    fa.states.update(names)
+    fa.alphabet.update(sigma)
+
+    for source in names:
+        for symbol in sigma:
+            if rng.random() < density:
+                fa.add_transition(source, symbol, rng.choice(names))
+
+    fa.accept_states = {state for state in names if rng.random() < 0.3}
+    fa.accept_states.add(rng.choice(names))
+
+    return fa
+
+
+def adversarial_regex(n: int) -> str:
+    """Retorna a expressão (a|b)*a(a|b)^n, cujo autômato determinístico
+    mínimo tem 2^(n + 1) estados.
+
+    Parâmetros:
+    n -- número de símbolos após o a
+    """
+    return '(a|b)*.a' + '.(a|b)' * n
+
+
+def random_words(rng: Random, count: int, symbols: int, min_length: int = 0,
+                 max_length: int = 16) -> List[str]:
+    """Retorna uma lista de palavras aleatórias.
+
+    Parâmetros:
+    rng        -- gerador de números aleatórios
+    count      -- número de palavras
+    symbols    -- tamanho do alfabeto
+    min_length -- tamanho mínimo das palavras (padrão 0)
+    max_length -- tamanho máximo das palavras (padrão 16)
+    """
+    sigma = SYMBOLS[:symbols]
+
+    return [
+        ''.join(rng.choice(sigma)
+                for _ in range(rng.randint(min_length, max_length)))
+        for _ in range(count)
+    ]
@@ -0,0 +1,124 @@
+import json
+import platform
+import time
+import tracemalloc
+from random import Random
+from typing import Any, Dict, Iterable, List
+
+from kleeneup import __version__
+
+from .suite import Benchmark
+
+
+def measure(setup, seed: int, size: int, repeat: int) -> Dict[str, Any]:
+    """Retorna o menor e o tempo médio de execução de um benchmark, e o pico
+    de memória medido em uma execução separada com tracemalloc.
+
+    Parâmetros:
+    setup  -- função que recebe (rng, size) e retorna a operação a medir
+    seed   -- semente dos geradores
+    size   -- tamanho da entrada
+    repeat -- número de execuções cronometradas
+    """
+    times = []
+
+    for _ in range(repeat):
+        run = setup(Random(seed), size)
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    # tracemalloc slows allocations down, so memory is measured apart from
+    # the timed runs.
+    run = setup(Random(seed), size)
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'min_seconds': min(times),
+        'mean_seconds': sum(times) / len(times),
+        'peak_bytes': peak,
+    }
+
+
+def run_benchmarks(benchmarks: Iterable[Benchmark], seed: int = 0,
+                   repeat: int = 3, quick: bool = False,
+                   progress=None) -> Dict[str, Any]:
+    """Executa os benchmarks e retorna os resultados em um dicionário
+    serializável em JSON.
+
+    Parâmetros:
+    benchmarks -- benchmarks a executar
+    seed       -- semente dos geradores (padrão 0)
+    repeat     -- número de execuções cronometradas (padrão 3)
+    quick      -- usa apenas os tamanhos pequenos (padrão False)
+    progress   -- função chamada com cada resultado (padrão None)
+    """
+    results = []  # type: List[Dict[str, Any]]
+
+    for benchmark in benchmarks:
+        for size in benchmark.quick_sizes if quick else benchmark.sizes:
+            result = {'benchmark': benchmark.name, 'size': size}
+            result.update(measure(benchmark.setup, seed, size, repeat))
+            results.append(result)
+
+            if progress is not None:
+                progress(result)
+
+    return {
+        'kleeneup': __version__,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'seed': seed,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any],
+            threshold: float = 1.2) -> List[Dict[str, Any]]:
+    """Retorna os resultados de new que ficaram mais lentos ou usaram mais
+    memória do que em old, acima de um limiar.
+
+    Parâmetros:
+    old       -- resultados de referência
+    new       -- resultados atuais
+    threshold -- razão a partir da qual há regressão (padrão 1.2)
+    """
+    reference = {
+        (r['benchmark'], r['size']): r for r in old['results']
+    }
+
+    regressions = []
+
+    for result in new['results']:
+        before = reference.get((result['benchmark'], result['size']))
+        if before is None:
+            continue
+
+        for key in ('min_seconds', 'peak_bytes'):
+            if before[key] and result[key] / before[key] > threshold:
+                regressions.append({
+                    'benchmark': result['benchmark'],
+                    'size': result['size'],
+                    'metric': key,
+                    'before': before[key],
+                    'after': result[key],
+                })
+
+    return regressions
+
+
+def save(results: Dict[str, Any], path: str):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+        f.write('\n')
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
@@ -0,0 +1,79 @@
+import tempfile
+from pathlib import Path
+from random import Random
+from typing import Callable, Dict, List, NamedTuple
+
+from kleeneup import RegularExpression, Sentence
+from kleeneup.util import fa_from_file, fa_to_file
+
+from .generators import (adversarial_regex, random_dfa, random_nfa,
+                         random_words)
+
+Benchmark = NamedTuple('Benchmark', [
+    ('name', str),
+    ('setup', Callable[[Random, int], Callable[[], object]]),
+    ('sizes', List[int]),
+    ('quick_sizes', List[int]),
+])
+
+
+def determinize(rng: Random, size: int):
+    fa = random_nfa(rng, size, 2, density=2 / size, epsilon=1 / size)
+    return fa.determinize
+
+
+def minimize(rng: Random, size: int):
+    fa = random_dfa(rng, size, 4)
+    return fa.minimize
+
+
+def intersection(rng: Random, size: int):
+    fa1 = random_dfa(rng, size, 2)
+    fa2 = random_dfa(rng, size, 2)
+    return lambda: fa1.intersection(fa2)
+
+
+def equality(rng: Random, size: int):
+    fa = random_dfa(rng, size, 2)
+    other = fa.minimize()
+    return lambda: fa == other
+
+
+def evaluate(rng: Random, size: int):
+    fa = random_dfa(rng, size, 4)
+    sentences = [Sentence(w) for w in random_words(rng, 1000, 4, 0, 64)]
+    return lambda: [fa.evaluate(s) for s in sentences]
+
+
+def regex(rng: Random, size: int):
+    expression = RegularExpression(adversarial_regex(size))
+    return expression.to_finite_automaton
+
+
+def file_io(binary: bool):
+    def setup(rng: Random, size: int):
+        fa = random_dfa(rng, size, 8)
+
+        def run():
+            with tempfile.TemporaryDirectory() as directory:
+                path = fa_to_file(fa, str(Path(directory) / 'bench'),
+                                  binary=binary)
+                return fa_from_file(str(path))
+
+        return run
+
+    return setup
+
+
+BENCHMARKS = [
+    Benchmark('determinize', determinize, [8, 16, 32, 64], [8, 16]),
+    Benchmark('minimize', minimize, [100, 500, 1000], [100]),
+    Benchmark('intersection', intersection, [10, 50, 100], [10]),
+    Benchmark('eq', equality, [10, 50, 100], [10]),
+    Benchmark('evaluate', evaluate, [100, 10000], [100]),
+    Benchmark('regex', regex, [2, 4, 8], [2]),
+    Benchmark('io_json', file_io(False), [1000, 10000, 100000], [1000]),
+    Benchmark('io_binary', file_io(True), [1000, 10000, 100000], [1000]),
+]  # type: List[Benchmark]
+
+BY_NAME = {b.name: b for b in BENCHMARKS}  # type: Dict[str, Benchmark]
@@ -1,3 +1,8 @@
+__version__ = '0.1.0'
+
 from .regular_grammar import RegularGrammar
-from .finite_automaton import FiniteAutomaton, State, Symbol, Sentence
+from .finite_automaton import FiniteAutomaton, Property, State, Symbol, Sentence
 from .regular_expression import RegularExpression, StitchedBinaryTree, Lambda
+from .pattern_set import PatternSet
+from .lazy import LazyAutomaton
+from . import cache, stats
@@ -1,11 +1,19 @@
+import os
+
 from cleo import Application
 
-from .cli import fa, re, rg
+from kleeneup import __version__, cache
+from .cli import fa, re, rg, serve
+
+cache_dir = os.environ.get('KLEENEUP_CACHE_DIR')
+if cache_dir:
+    cache.enable(directory=cache_dir)
 
-application = Application(name='kleeneup', version='0.1')
+application = Application(name='kleeneup', version=__version__)
 
 application.add_commands(fa.commands)
 application.add_commands(rg.commands)
 application.add_commands(re.commands)
+application.add_commands(serve.commands)
 
 application.run()
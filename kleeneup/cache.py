@@ -0,0 +1,233 @@
+import hashlib
+import os
+import pickle
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from . import __version__
+
+
+def fingerprint(fa) -> str:
+    """Retorna um hash do conteúdo de um autômato finito, independente da
+    ordem em que estados e transições foram inseridos.
+
+    Parâmetros:
+    fa -- o autômato finito
+    """
+    h = hashlib.sha256()
+
+    h.update(repr((
+        fa.initial_state,
+        sorted(fa.accept_states),
+        sorted(fa.states),
+        sorted(symbol.value for symbol in fa.alphabet),
+        fa.implicit_sink,
+        fa.sink_accepting,
+    )).encode('utf-8'))
+
+    for state in sorted(fa._delta):
+        t = fa._delta[state]
+        for symbol in sorted(t):
+            h.update(repr(
+                (state, symbol.value, sorted(t[symbol]))).encode('utf-8'))
+
+    return h.hexdigest()
+
+
+def _key_part(arg) -> str:
+    if hasattr(arg, '_delta'):
+        return fingerprint(arg)
+
+    if isinstance(arg, (list, tuple)):
+        return '[{}]'.format(','.join(_key_part(a) for a in arg))
+
+    if isinstance(arg, (set, frozenset)):
+        return '{{{}}}'.format(','.join(sorted(_key_part(a) for a in arg)))
+
+    return repr(arg)
+
+
+class OperationCache:
+    def __init__(
+            self,
+            maxsize: int = 128,
+            directory: Optional[Union[str, Path]] = None,
+            max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        """Retorna um cache de resultados de operações sobre autômatos, com
+        remoção do item usado há mais tempo (LRU).
+
+        Parâmetros:
+        maxsize   -- número máximo de resultados em memória (padrão 128)
+        directory -- diretório para guardar resultados em disco (padrão None)
+        max_bytes -- tamanho máximo do diretório em bytes (padrão 256 MiB)
+        """
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory is not None else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()  # type: OrderedDict
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, operation: str, args, kwargs) -> str:
+        h = hashlib.sha256()
+        h.update(__version__.encode('utf-8'))
+        h.update(operation.encode('utf-8'))
+        h.update(_key_part(list(args)).encode('utf-8'))
+        h.update(_key_part(sorted(kwargs.items())).encode('utf-8'))
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / '{}.pickle'.format(key)
+
+    def get(self, key: str) -> Any:
+        try:
+            value = self._memory[key]
+        except KeyError:
+            value = self._get_from_disk(key)
+
+            if value is None:
+                self.misses += 1
+                return None
+
+            self._remember(key, value)
+        else:
+            self._memory.move_to_end(key)
+
+        self.hits += 1
+        return value.copy()
+
+    def _get_from_disk(self, key: str) -> Any:
+        if self.directory is None:
+            return None
+
+        path = self._path(key)
+
+        try:
+            with path.open('rb') as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        os.utime(str(path))
+        return value
+
+    def put(self, key: str, value: Any):
+        self._remember(key, value.copy())
+
+        if self.directory is not None:
+            path = self._path(key)
+            tmp_path = path.with_suffix('.tmp{}'.format(os.getpid()))
+
+            with tmp_path.open('wb') as f:
+                pickle.dump(value, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(str(tmp_path), str(path))
+
+            self._evict_from_disk()
+
+    def _remember(self, key: str, value: Any):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def _evict_from_disk(self):
+        entries = []
+        total = 0
+
+        for path in self.directory.glob('*.pickle'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        entries.sort()
+
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        self._memory.clear()
+
+        if self.directory is not None:
+            for path in self.directory.glob('*.pickle'):
+                path.unlink()
+
+
+_active = None  # type: Optional[OperationCache]
+
+
+def enable(*args, **kwargs) -> OperationCache:
+    """Ativa um cache de operações global e o retorna. Os parâmetros são os
+    mesmos de OperationCache.
+    """
+    global _active
+    _active = OperationCache(*args, **kwargs)
+    return _active
+
+
+def disable():
+    global _active
+    _active = None
+
+
+def active() -> Optional[OperationCache]:
+    return _active
+
+
+@contextmanager
+def caching(*args, **kwargs):
+    """Ativa um cache de operações apenas dentro de um bloco with."""
+    global _active
+    previous = _active
+    _active = OperationCache(*args, **kwargs)
+
+    try:
+        yield _active
+    finally:
+        _active = previous
+
+
+def cached(operation):
+    """Decora uma operação para que o seu resultado seja guardado no cache
+    ativo, se houver um.
+    """
+    @wraps(operation)
+    def wrapper(*args, **kwargs):
+        cache = _active
+
+        if cache is None:
+            return operation(*args, **kwargs)
+
+        args = tuple(
+            list(arg) if isinstance(arg, Iterator) else arg
+            for arg in args
+        )
+
+        key = cache.key(operation.__qualname__, args, kwargs)
+        result = cache.get(key)
+
+        if result is None:
+            result = operation(*args, **kwargs)
+            cache.put(key, result)
+
+        return result
+
+    return wrapper
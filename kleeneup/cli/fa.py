@@ -1,12 +1,14 @@
 from cleo import Command
 from cleo.exceptions import MissingArguments
 
-from kleeneup import FiniteAutomaton, Sentence, State, Symbol
-from kleeneup.cli.util import write_file_and_print_table
+from kleeneup import FiniteAutomaton, Sentence, State, Symbol, codegen
+from kleeneup.cli.util import OutputCommand, write_file_and_print_table
+from kleeneup.pipeline import Pipeline, PipelineError
+from kleeneup.spill import CheckpointMismatch
 from kleeneup.util import fa_from_file, rg_to_file
 
 
-class Create(Command):
+class Create(OutputCommand):
     """
     Creates a stub file for a new automaton
 
@@ -55,13 +57,16 @@ class Evaluate(Command):
             self.error('Rejected')
 
 
-class Determinize(Command):
+class Determinize(OutputCommand):
     """
     Determinizes a finite automaton
 
     fa:determinize
         {fa : the automaton}
         {out? : file to export the resulting automaton}
+        {--m|memory= : memory budget in MiB before spilling to disk}
+        {--checkpoint= : SQLite file to save progress to and resume from}
+        {--w|workers= : number of processes for the subset construction}
     """
 
     def handle(self):
@@ -69,12 +74,26 @@ class Determinize(Command):
 
         fa = fa_from_file(fa_path)
 
-        new_fa = fa.determinize()
+        memory_limit = self.option('memory')
+        if memory_limit is not None:
+            memory_limit = int(float(memory_limit) * 1024 * 1024)
+
+        workers = self.option('workers')
+        if workers is not None:
+            workers = int(workers)
+
+        try:
+            new_fa = fa.determinize(memory_limit=memory_limit,
+                                    checkpoint=self.option('checkpoint'),
+                                    workers=workers)
+        except (CheckpointMismatch, ValueError) as e:
+            self.error(str(e))
+            return 1
 
         write_file_and_print_table(self, new_fa, self.argument('out'))
 
 
-class Minimize(Command):
+class Minimize(OutputCommand):
     """
     Minimizes a finite automaton
 
@@ -93,29 +112,41 @@ class Minimize(Command):
         write_file_and_print_table(self, new_fa, self.argument('out'))
 
 
-class Union(Command):
+class Union(OutputCommand):
     """
-    Computes the union of two finite automata
+    Computes the union of finite automata
 
     fa:union
-        {fa1 : first automaton}
-        {fa2 : second automaton}
-        {out? : file to export the resulting automaton}
+        {fa* : the automata; without --out, a third file is the output}
+        {--o|out= : file to export the resulting automaton}
+        {--w|workers= : number of worker processes}
     """
 
     def handle(self):
-        fa1_path = self.argument('fa1')
-        fa2_path = self.argument('fa2')
+        fa_paths = self.argument('fa')
+        out = self.option('out')
 
-        fa1 = fa_from_file(fa1_path)
-        fa2 = fa_from_file(fa2_path)
+        # The old form "fa:union fa1 fa2 out" still works: without --out,
+        # a third argument is the output. Three or more inputs need --out.
+        if out is None and len(fa_paths) == 3:
+            fa_paths, out = fa_paths[:2], fa_paths[2]
+        elif out is None and len(fa_paths) > 3:
+            self.error('use --out to write the union of more than two '
+                       'automata')
+            return 1
 
-        new_fa = fa1.union(fa2)
+        fas = [fa_from_file(fa_path) for fa_path in fa_paths]
 
-        write_file_and_print_table(self, new_fa, self.argument('out'))
+        workers = self.option('workers')
+        if workers is not None:
+            workers = int(workers)
+
+        new_fa = FiniteAutomaton.union_all(fas, workers=workers)
+
+        write_file_and_print_table(self, new_fa, out)
 
 
-class Intersection(Command):
+class Intersection(OutputCommand):
     """
     Computes the intersection of two finite automata
 
@@ -137,6 +168,80 @@ class Intersection(Command):
         write_file_and_print_table(self, new_fa, self.argument('out'))
 
 
+class FromWords(OutputCommand):
+    """
+    Builds the minimal automaton that accepts exactly the words of a file
+
+    fa:words
+        {words : file with one word per line, in sorted order; blank lines are ignored}
+        {out? : file to export the resulting automaton}
+        {--sort : sort the words before building the automaton}
+    """
+
+    def handle(self):
+        with open(self.argument('words')) as f:
+            words = (line.strip() for line in f if line.strip())
+
+            if self.option('sort'):
+                words = iter(sorted(words))
+
+            try:
+                new_fa = FiniteAutomaton.from_words(words)
+            except ValueError as e:
+                self.error(str(e))
+                return 1
+
+        write_file_and_print_table(self, new_fa, self.argument('out'))
+
+
+class RunPipeline(OutputCommand):
+    """
+    Runs a chain of operations in a single process, e.g. min(union(a, b))
+
+    fa:pipeline
+        {expression : the operations to run}
+        {out? : file to export the resulting automaton}
+        {--p|plan : print the planned operations before running them}
+    """
+
+    def handle(self):
+        try:
+            pipeline = Pipeline(self.argument('expression'))
+        except PipelineError as e:
+            self.error(str(e))
+            return 1
+
+        if self.option('plan'):
+            self.line(repr(pipeline.plan))
+
+        new_fa = pipeline.run()
+
+        write_file_and_print_table(self, new_fa, self.argument('out'))
+
+
+class Codegen(Command):
+    """
+    Generates a standalone Python module that matches sentences of an automaton
+
+    fa:codegen
+        {fa : the automaton}
+        {out : file to write the module to}
+        {--f|function=match : name of the generated function}
+    """
+
+    def handle(self):
+        fa = fa_from_file(self.argument('fa'))
+
+        try:
+            path = codegen.write(fa, self.argument('out'),
+                                 self.option('function'))
+        except ValueError as e:
+            self.error(str(e))
+            return 1
+
+        self.info('Wrote matcher module to {}'.format(path))
+
+
 class ConvertToRG(Command):
     """
     Converts an automaton to a regular grammar
@@ -164,4 +269,4 @@ class ConvertToRG(Command):
             self.info('Wrote regular grammar to {}'.format(path))
 
 
-commands = [Create(), Evaluate(), Determinize(), Minimize(), Union(), Intersection(), ConvertToRG()]
+commands = [Create(), Evaluate(), Determinize(), Minimize(), Union(), Intersection(), FromWords(), RunPipeline(), Codegen(), ConvertToRG()]
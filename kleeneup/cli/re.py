@@ -2,10 +2,10 @@ from cleo import Command
 from cleo.exceptions import MissingArguments
 
 from kleeneup import RegularExpression
-from kleeneup.cli.util import write_file_and_print_table
+from kleeneup.cli.util import OutputCommand, write_file_and_print_table
 
 
-class ConvertToFA(Command):
+class ConvertToFA(OutputCommand):
     """
     Converts a regular expression to a non-deterministic finite automaton
 
@@ -2,7 +2,7 @@ from cleo import Command
 from cleo.exceptions import MissingArguments
 
 from kleeneup import RegularGrammar
-from kleeneup.cli.util import write_file_and_print_table
+from kleeneup.cli.util import OutputCommand, write_file_and_print_table
 from kleeneup.util import rg_from_file, rg_to_file
 
 
@@ -27,7 +27,7 @@ class Create(Command):
         self.info('Wrote regular grammar to {}'.format(path))
 
 
-class ConvertToFA(Command):
+class ConvertToFA(OutputCommand):
     """
     Converts a grammar to a non-deterministic finite automaton
 
@@ -0,0 +1,36 @@
+from cleo import Command
+
+from kleeneup.server import Server
+from kleeneup.util import fa_from_file
+
+
+class Serve(Command):
+    """
+    Keeps automata in memory and answers requests on a Unix socket
+
+    serve
+        {socket : path of the socket}
+        {--w|workers= : number of worker processes}
+        {--l|load=* : automaton to load on start, as name=file}
+    """
+
+    def handle(self):
+        workers = self.option('workers')
+        if workers is not None:
+            workers = int(workers)
+
+        server = Server(self.argument('socket'), workers=workers)
+
+        for entry in self.option('load'):
+            name, _, path = entry.partition('=')
+            server.automata[name] = fa_from_file(path or name)
+
+        self.info('Listening on {}'.format(server.path))
+        try:
+            server.serve_forever()
+        except FileExistsError as e:
+            self.error(str(e))
+            return 1
+
+
+commands = [Serve()]
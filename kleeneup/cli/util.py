@@ -1,10 +1,39 @@
-from typing import Optional
+import time
+from typing import Iterator, List, Optional
 
-from cleo import Command
+from cleo import Command, InputOption
 
-from kleeneup import FiniteAutomaton
+from kleeneup import FiniteAutomaton, Symbol, stats
+from kleeneup.finite_automaton import ERROR_STATE
 from kleeneup.util import fa_to_file
 
+class OutputCommand(Command):
+    # Options shared by every command that exports a finite automaton.
+    options = [
+        InputOption('binary', 'b', InputOption.VALUE_NONE,
+                    'write the automaton in the binary format'),
+        InputOption('compact', None, InputOption.VALUE_NONE,
+                    'write the automaton as JSON without indentation'),
+        InputOption('summary', 's', InputOption.VALUE_NONE,
+                    'print counts and timings instead of the table'),
+        InputOption('no-table', None, InputOption.VALUE_NONE,
+                    'do not print the transition table'),
+        InputOption('stats', None, InputOption.VALUE_NONE,
+                    'print statistics of each operation'),
+    ]
+
+    def execute(self, i, o):
+        self.started_at = time.perf_counter()
+
+        if not i.get_option('stats'):
+            return super().execute(i, o)
+
+        with stats.collecting(memory=True) as records:
+            result = super().execute(i, o)
+
+        print_stats(self, records)
+        return result
+
 
 def str_set_of_states(states):
     return ', '.join(sorted(states))
@@ -16,32 +45,132 @@ def str_prev_state(prev_state, fa):
     if prev_state == fa.initial_state:
         prefix += '->'
 
-    if prev_state in fa.accept_states:
+    if fa.is_accepting(prev_state):
         prefix += '*'
 
     return prefix.rjust(3, ' ') + prev_state
 
 
-def write_file_and_print_table(cmd: Command, fa: FiniteAutomaton, out: Optional[str]):
-    alphabet = sorted(fa.alphabet)
+def sink_transitions(fa: FiniteAutomaton) -> int:
+    # Number of transitions that lead to a virtual sink, which gets its own
+    # row only if there is at least one.
+    if not fa.implicit_sink or ERROR_STATE in fa.states:
+        return 0
+
+    symbols = fa.alphabet - {Symbol('&')}
+    return sum(
+        len(symbols - fa._delta.get(state, {}).keys())
+        for state in fa.states
+    )
+
 
-    transitions = []
+def table_states(fa: FiniteAutomaton) -> List[str]:
+    # Only the sorted names are kept; rows are built as they are written.
+    states = sorted(fa.states)
 
-    for state in sorted(fa.states):
-        line = [str_prev_state(state, fa)]
+    if sink_transitions(fa):
+        states.append(ERROR_STATE)
 
-        for symbol in alphabet:
-            new_state = fa.transitate(state, symbol)
+    return states
 
-            line.append(str_set_of_states(new_state))
 
-        transitions.append(line)
+def table_rows(fa: FiniteAutomaton, alphabet: List[Symbol],
+               states: List[str]) -> Iterator[List[str]]:
+    for state in states:
+        yield [str_prev_state(state, fa)] + [
+            str_set_of_states(fa.transitate(state, symbol))
+            for symbol in alphabet
+        ]
 
-    cmd.render_table(
-        ['K \ Σ', *[str(s) for s in alphabet]],
-        transitions,
+
+def print_table(cmd: Command, fa: FiniteAutomaton):
+    alphabet = sorted(fa.alphabet)
+    headers = ['K \\ Σ', *[str(s) for s in alphabet]]
+    states = table_states(fa)
+
+    # Rows are built twice, once to find the width of each column and once
+    # to write them, so the table is never held in memory.
+    widths = [len(header) for header in headers]
+    for row in table_rows(fa, alphabet, states):
+        widths = [max(width, len(cell)) for width, cell in zip(widths, row)]
+
+    border = '+' + '+'.join('-' * (width + 2) for width in widths) + '+'
+
+    def write(row):
+        cmd.line('|' + '|'.join(
+            ' {} '.format(cell.ljust(width))
+            for cell, width in zip(row, widths)) + '|')
+
+    cmd.line(border)
+    write(headers)
+    cmd.line(border)
+    for row in table_rows(fa, alphabet, states):
+        write(row)
+    cmd.line(border)
+
+
+def print_summary(cmd: Command, fa: FiniteAutomaton):
+    # The virtual sink is counted as in the table: a state with a
+    # transition by each symbol, and an accept state if it accepts.
+    to_sink = sink_transitions(fa)
+    sink = 1 if to_sink else 0
+
+    transitions = sum(
+        len(next_states)
+        for t in fa._delta.values()
+        for next_states in t.values()
     )
+    if sink:
+        transitions += to_sink + len(fa.alphabet - {Symbol('&')})
+
+    cmd.line('States: {}'.format(len(fa.states) + sink))
+    cmd.line('Accept states: {}'.format(
+        len(fa.accept_states) + (sink if fa.sink_accepting else 0)))
+    cmd.line('Symbols: {}'.format(len(fa.alphabet)))
+    cmd.line('Transitions: {}'.format(transitions))
+    cmd.line('Deterministic: {}'.format(
+        'yes' if fa.is_deterministic() else 'no'))
+
+    started_at = getattr(cmd, 'started_at', None)
+    if started_at is not None:
+        cmd.line('Computed in {:.3f}s'.format(
+            time.perf_counter() - started_at))
+
+
+def print_stats(cmd: Command, records: List[stats.OperationStats]):
+    rows = [
+        [
+            '  ' * r.depth + r.operation,
+            '{:.4f}s'.format(r.seconds),
+            str(r.subset_states),
+            str(r.largest_subset),
+            str(r.refinement_rounds),
+            str(r.transitions_added),
+            '{:,}'.format(r.peak_memory) if r.peak_memory is not None else '',
+        ]
+        for r in sorted(records, key=lambda r: r.started_at)
+    ]
+
+    if rows:
+        cmd.render_table(
+            ['operation', 'time', 'subsets', 'largest subset', 'rounds',
+             'transitions', 'peak memory (B)'],
+            rows,
+        )
+
+
+def write_file_and_print_table(cmd: Command, fa: FiniteAutomaton, out: Optional[str]):
+    if cmd.option('summary'):
+        print_summary(cmd, fa)
+    elif not cmd.option('no-table'):
+        print_table(cmd, fa)
 
     if out is not None:
-        path = fa_to_file(fa, out)
+        started_at = time.perf_counter()
+        path = fa_to_file(fa, out, binary=cmd.option('binary'),
+                          compact=cmd.option('compact'))
         cmd.info('Wrote finite automaton to {}'.format(path))
+
+        if cmd.option('summary'):
+            cmd.line('Written in {:.3f}s'.format(
+                time.perf_counter() - started_at))
@@ -0,0 +1,213 @@
+import keyword
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from . import __version__
+from .finite_automaton import FiniteAutomaton, Property, Symbol
+
+HEADER = '''\
+# Generated by kleeneup {version} from a minimal deterministic finite
+# automaton with {states} states. It does not depend on kleeneup.
+
+
+class _Classes(dict):
+    # Characters outside the alphabet fall in the rejecting class.
+    def __missing__(self, key):
+        return {reject_char!r}
+
+
+# Class of each character of the alphabet, as a character whose code is the
+# class number, for str.translate.
+_CLASSES = _Classes({classes})
+
+# The transition of the state at offset s by class c is _TABLE[s + c].
+_TABLE = (
+{table}
+)
+
+_INITIAL = {initial}
+_ACCEPT = frozenset({accept})
+'''
+
+# Automata with a dead state stop reading as soon as it is reached.
+MATCH_WITH_DEAD_STATE = '''
+_DEAD = {dead}
+
+
+def {function}(text):
+    table = _TABLE
+    dead = _DEAD
+    state = _INITIAL
+
+    for c in text.translate(_CLASSES).encode('latin-1'):
+        state = table[state + c]
+        if state == dead:
+            return False
+
+    return state in _ACCEPT
+'''
+
+# Complete automata only reject unknown characters, which are found before
+# reading the text.
+MATCH_COMPLETE = '''
+_REJECT = {reject!r}
+
+
+def {function}(text):
+    table = _TABLE
+    state = _INITIAL
+    codes = text.translate(_CLASSES).encode('latin-1')
+
+    if _REJECT in codes:
+        return False
+
+    for c in codes:
+        state = table[state + c]
+
+    return state in _ACCEPT
+'''
+
+
+def generate(fa: FiniteAutomaton, function: str = 'match') -> str:
+    """Retorna o código-fonte de um módulo Python independente com uma função
+    que diz se um texto é aceito pelo autômato, usando o autômato mínimo.
+
+    Os caracteres são convertidos em classes de símbolos com str.translate e
+    os estados são deslocamentos em uma tabela de transições constante.
+
+    Parâmetros:
+    fa       -- o autômato finito
+    function -- nome da função gerada (padrão 'match')
+    """
+    if not function.isidentifier() or keyword.iskeyword(function):
+        raise ValueError('invalid function name {!r}'.format(function))
+
+    epsilon = Symbol('&')
+    symbols = [symbol for symbol in fa.alphabet if symbol != epsilon]
+
+    if Property.MINIMAL not in fa.properties:
+        if not fa.is_deterministic():
+            fa = fa.determinize()
+        fa = fa.minimize()
+
+    fa = fa._without_sink().copy()
+    fa.reset_state_names()
+
+    symbol_classes = fa.symbol_classes()
+    classed = {symbol for symbol_class in symbol_classes
+               for symbol in symbol_class}
+
+    # Symbols without transitions share one class with the unknown
+    # characters, the last one.
+    reject = len(symbol_classes)
+    columns = reject + 1
+
+    class_of = {}  # type: Dict[str, int]
+    for c, symbol_class in enumerate(symbol_classes):
+        for symbol in symbol_class:
+            class_of[str(symbol)] = c
+    for symbol in symbols:
+        if symbol not in classed:
+            class_of[str(symbol)] = reject
+
+    states = sorted(fa.states, key=lambda s: int(s[1:]))
+    offset = {state: i * columns for i, state in enumerate(states)}
+    dead = len(states) * columns
+
+    table = []  # type: List[int]
+    complete = True
+    for state in states:
+        t = fa._delta.get(state, {})
+
+        for symbol_class in symbol_classes:
+            next_states = t.get(min(symbol_class))
+            if next_states:
+                table.append(offset[next(iter(next_states))])
+            else:
+                table.append(dead)
+                complete = False
+
+        table.append(dead)
+    table.extend([dead] * columns)
+
+    source = HEADER.format(
+        version=__version__,
+        states=len(states),
+        reject_char=chr(reject),
+        classes=_format_dict(
+            {ord(char): chr(c) for char, c in class_of.items()}),
+        table=_wrap(['{},'.format(n) for n in table]),
+        initial=offset[fa.initial_state],
+        accept='{{{}}}'.format(', '.join(
+            str(offset[s]) for s in states if s in fa.accept_states)),
+    )
+
+    if complete:
+        source += MATCH_COMPLETE.format(
+            function=function, reject=bytes([reject]))
+    else:
+        source += MATCH_WITH_DEAD_STATE.format(
+            function=function, dead=dead)
+
+    return source
+
+
+def write(fa: FiniteAutomaton, filename: str,
+          function: str = 'match') -> Path:
+    """Grava o módulo gerado por generate e retorna o caminho do arquivo.
+
+    Parâmetros:
+    fa       -- o autômato finito
+    filename -- caminho do arquivo (a extensão .py é adicionada se faltar)
+    function -- nome da função gerada (padrão 'match')
+    """
+    ext = '.py'
+
+    if not filename.endswith(ext):
+        filename = filename + ext
+
+    path = Path(filename)
+
+    with path.open('w') as f:
+        f.write(generate(fa, function))
+
+    return path
+
+
+def matcher(fa: FiniteAutomaton) -> Callable[[str], bool]:
+    """Retorna a função gerada por generate, já carregada, sem gravar o
+    módulo em disco.
+
+    Parâmetros:
+    fa -- o autômato finito
+    """
+    namespace = {}  # type: dict
+    exec(compile(generate(fa), '<kleeneup matcher>', 'exec'), namespace)
+    return namespace['match']
+
+
+def _wrap(items: List[str], width: int = 75) -> str:
+    # Joins items with spaces into indented lines, breaking only between
+    # items.
+    lines = []  # type: List[str]
+    line = ''
+
+    for item in items:
+        if line and len(line) + 1 + len(item) > width:
+            lines.append(line)
+            line = item
+        else:
+            line = '{} {}'.format(line, item) if line else item
+
+    if line:
+        lines.append(line)
+
+    return '\n'.join('    ' + line for line in lines)
+
+
+def _format_dict(d: Dict[int, str]) -> str:
+    if not d:
+        return '{}'
+
+    items = ['{!r}: {!r},'.format(k, v) for k, v in sorted(d.items())]
+    return '{\n' + _wrap(items) + '\n}'
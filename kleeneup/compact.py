@@ -0,0 +1,280 @@
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Set, Union
+
+from .finite_automaton import FiniteAutomaton, Property, Sentence, State, Symbol
+
+MAGIC = b'KFA\0'
+VERSION = 1
+
+# magic, version, flags, states, symbols, accept states, transitions,
+# initial state
+HEADER = struct.Struct('<4sHHIIIII')
+
+IMPLICIT_SINK = 1
+SINK_ACCEPTING = 2
+
+
+class MalformedAutomaton(Exception):
+    pass
+
+
+def _uint32_array(values) -> bytes:
+    a = array('I', values)
+    if sys.byteorder != 'little':
+        a.byteswap()
+    return a.tobytes()
+
+
+def dumps(fa: FiniteAutomaton) -> bytes:
+    """Retorna a representação binária de um autômato finito.
+
+    O formato é composto por um cabeçalho, a tabela de nomes de estados, os
+    estados de aceitação e as transições em formato CSR: para cada estado i,
+    as transições são as posições row_offsets[i] até row_offsets[i + 1] dos
+    vetores de símbolos e de destinos.
+
+    Parâmetros:
+    fa -- o autômato finito
+    """
+    states = sorted(fa.states | {fa.initial_state})
+    index = {state: i for i, state in enumerate(states)}
+
+    symbols = sorted(fa.alphabet)
+    symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    names = [state.encode('utf-8') for state in states]
+    name_offsets = [0]
+    for name in names:
+        name_offsets.append(name_offsets[-1] + len(name))
+
+    row_offsets = [0]
+    targets = []  # type: List[int]
+    symbol_ids = bytearray()
+
+    for state in states:
+        t = fa._delta.get(state, {})
+
+        for symbol in sorted(t):
+            row = sorted(index[next_state] for next_state in t[symbol])
+            targets.extend(row)
+            symbol_ids.extend([symbol_index[symbol]] * len(row))
+
+        row_offsets.append(len(targets))
+
+    flags = 0
+    if fa.implicit_sink:
+        flags |= IMPLICIT_SINK
+        if fa.sink_accepting:
+            flags |= SINK_ACCEPTING
+
+    accept_states = sorted(index[state] for state in fa.accept_states
+                           if state in index)
+
+    return b''.join([
+        HEADER.pack(MAGIC, VERSION, flags, len(states), len(symbols),
+                    len(accept_states), len(targets),
+                    index[fa.initial_state]),
+        _uint32_array(name_offsets),
+        _uint32_array(accept_states),
+        _uint32_array(row_offsets),
+        _uint32_array(targets),
+        bytes(symbol_ids),
+        ''.join(str(symbol) for symbol in symbols).encode('ascii'),
+        b''.join(names),
+    ])
+
+
+def dump(fa: FiniteAutomaton, f: BinaryIO):
+    f.write(dumps(fa))
+
+
+def is_compact(f: BinaryIO) -> bool:
+    return f.read(len(MAGIC)) == MAGIC
+
+
+def load(path: Union[str, Path]) -> 'CompactAutomaton':
+    """Retorna um autômato compacto mapeado diretamente do arquivo.
+
+    Parâmetros:
+    path -- caminho do arquivo
+    """
+    with open(str(path), 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return CompactAutomaton(buffer)
+
+
+class CompactAutomaton:
+    def __init__(self, buffer) -> None:
+        """Retorna um autômato finito somente leitura sobre um buffer no
+        formato binário, sem copiar as tabelas de transição.
+
+        Parâmetros:
+        buffer -- objeto que suporte o protocolo de buffer (bytes, mmap)
+        """
+        self._buffer = buffer
+        self._views = []  # type: List[memoryview]
+
+        view = self._view(memoryview(buffer))
+
+        if len(view) < HEADER.size:
+            raise MalformedAutomaton('truncated header')
+
+        (magic, version, flags, n_states, n_symbols, n_accept,
+         n_transitions, initial_state) = HEADER.unpack_from(view)
+
+        if magic != MAGIC:
+            raise MalformedAutomaton('not a binary automaton')
+
+        if version != VERSION:
+            raise MalformedAutomaton(
+                'unsupported version {}'.format(version))
+
+        self.implicit_sink = bool(flags & IMPLICIT_SINK)
+        self.sink_accepting = bool(flags & SINK_ACCEPTING)
+        self.initial_state = initial_state
+        self.n_states = n_states
+
+        offset = HEADER.size
+        sections = []
+        for length in (n_states + 1, n_accept, n_states + 1, n_transitions):
+            sections.append(self._uint32(view, offset, length))
+            offset += 4 * length
+
+        (self._name_offsets, self._accept_states, self.row_offsets,
+         self.targets) = sections
+
+        self.symbol_ids = self._view(view[offset:offset + n_transitions])
+        offset += n_transitions
+
+        self.symbols = bytes(view[offset:offset + n_symbols]).decode('ascii')
+        offset += n_symbols
+
+        self._names = self._view(view[offset:])
+
+        if len(self._names) != self._name_offsets[n_states]:
+            raise MalformedAutomaton('truncated state names')
+
+        self._symbol_index = {
+            symbol: i for i, symbol in enumerate(self.symbols)
+        }  # type: Dict[str, int]
+        self._accept_set = None  # type: Optional[Set[int]]
+
+    def _view(self, view: memoryview) -> memoryview:
+        self._views.append(view)
+        return view
+
+    def _uint32(self, view: memoryview, offset: int, length: int):
+        chunk = view[offset:offset + 4 * length]
+
+        if len(chunk) != 4 * length:
+            raise MalformedAutomaton('truncated section')
+
+        if sys.byteorder == 'little' and array('I').itemsize == 4:
+            return self._view(self._view(chunk).cast('I'))
+
+        a = array('I', bytes(chunk))
+        if sys.byteorder != 'little':
+            a.byteswap()
+        return a
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+
+    def __enter__(self) -> 'CompactAutomaton':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def state_name(self, state: int) -> State:
+        start = self._name_offsets[state]
+        end = self._name_offsets[state + 1]
+        return State(bytes(self._names[start:end]).decode('utf-8'))
+
+    @property
+    def accept_states(self) -> Set[int]:
+        if self._accept_set is None:
+            self._accept_set = set(self._accept_states)
+        return self._accept_set
+
+    def transitate(self, state: int, symbol: str) -> Set[int]:
+        symbol_id = self._symbol_index.get(symbol)
+
+        if symbol_id is None:
+            return set()
+
+        if state == self.n_states:
+            return {state} if symbol != '&' else set()
+
+        next_states = {
+            self.targets[i]
+            for i in range(self.row_offsets[state],
+                           self.row_offsets[state + 1])
+            if self.symbol_ids[i] == symbol_id
+        }
+
+        if not next_states and self.implicit_sink and symbol != '&':
+            return {self.n_states}
+
+        return next_states
+
+    def evaluate(self, sentence: Union[str, Sentence]) -> bool:
+        current_states = {self.initial_state}
+
+        for symbol in str(sentence):
+            current_states = {
+                next_state
+                for state in current_states
+                for next_state in self.transitate(state, symbol)
+            }
+
+        accept_states = self.accept_states
+        return any(
+            state in accept_states or
+            (state == self.n_states and self.sink_accepting)
+            for state in current_states
+        )
+
+    def to_finite_automaton(self) -> FiniteAutomaton:
+        names = [self.state_name(i) for i in range(self.n_states)]
+        symbols = [Symbol(c) for c in self.symbols]
+
+        fa = FiniteAutomaton(
+            {},
+            names[self.initial_state],
+            (names[i] for i in self._accept_states),
+        )
+
+        row_offsets = self.row_offsets
+        targets = self.targets
+        symbol_ids = self.symbol_ids
+
+        for i, name in enumerate(names):
+            start, end = row_offsets[i], row_offsets[i + 1]
+            if start == end:
+                continue
+
+            t = fa._delta[name] = {}
+            for k in range(start, end):
+                t.setdefault(symbols[symbol_ids[k]], set()).add(
+                    names[targets[k]])
+
+        fa.states = set(names)
+        fa.alphabet = set(symbols)
+        fa.implicit_sink = self.implicit_sink
+        fa.sink_accepting = self.sink_accepting
+
+        if self.implicit_sink:
+            fa.properties.add(Property.COMPLETE)
+
+        return fa
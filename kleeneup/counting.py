@@ -0,0 +1,304 @@
+from bisect import bisect_right
+from itertools import accumulate
+from random import Random
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# NumPy older than 1.17 has no numpy.random.default_rng; the pure Python
+# code is used instead.
+if numpy is not None and not hasattr(numpy.random, 'default_rng'):
+    numpy = None
+
+# Automata with up to this many states use a dense transition matrix with
+# NumPy; larger ones use the list of transitions.
+DENSE_LIMIT = 1024
+
+# Values stay below 2^INT64_BITS while NumPy's int64 arithmetic is used.
+INT64_BITS = 62
+
+
+class TransitionMatrix:
+    def __init__(self, fa) -> None:
+        """Retorna a matriz de adjacência de um autômato finito
+        determinístico: a posição (i, j) é o número de símbolos que levam do
+        estado i ao estado j. Apenas estados alcançáveis são considerados.
+
+        Parâmetros:
+        fa -- o autômato finito (é determinizado se necessário)
+        """
+        initial_state, rows, accept_states = fa._reachable_rows()
+
+        states = sorted(rows)
+        index = {state: i for i, state in enumerate(states)}
+
+        multiplicities = {}  # type: dict
+        for state, row in rows.items():
+            for _, next_state in row:
+                key = (index[state], index[next_state])
+                multiplicities[key] = multiplicities.get(key, 0) + 1
+
+        # Outgoing transitions of each state as (symbol, next state index),
+        # in symbol order.
+        self.rows = [
+            [(symbol, index[next_state]) for symbol, next_state in rows[state]]
+            for state in states
+        ]
+
+        self.size = len(states)
+        self.initial = index[initial_state]
+        self.accept = [index[state] for state in accept_states]
+        self.edges = [
+            (i, j, m) for (i, j), m in sorted(multiplicities.items())
+        ]  # type: List[Tuple[int, int, int]]
+        self.max_degree = max((len(row) for row in rows.values()), default=0)
+
+    def fits_int64(self, length: int) -> bool:
+        # Entries of M^length are bounded by max_degree^length.
+        return (self.max_degree <= 1 or
+                length * self.max_degree.bit_length() <= INT64_BITS)
+
+    def accept_vector(self) -> List[int]:
+        vector = [0] * self.size
+        for i in self.accept:
+            vector[i] = 1
+        return vector
+
+    def step(self, vector: List[int]) -> List[int]:
+        result = [0] * self.size
+        for i, j, m in self.edges:
+            if vector[j]:
+                result[i] += m * vector[j]
+        return result
+
+    def dense(self, dtype):
+        matrix = numpy.zeros((self.size, self.size), dtype=dtype)
+        for i, j, m in self.edges:
+            matrix[i, j] = m
+        return matrix
+
+    def power_row(self, n: int) -> List[int]:
+        """Retorna a linha do estado inicial de M^n, calculada por
+        exponenciação rápida.
+
+        Parâmetros:
+        n -- o expoente
+        """
+        if numpy is not None:
+            dtype = numpy.int64 if self.fits_int64(n) else object
+            matrix = self.dense(dtype)
+            row = numpy.zeros(self.size, dtype=dtype)
+            row[self.initial] = 1
+
+            while n:
+                if n & 1:
+                    row = row.dot(matrix)
+                n >>= 1
+                if n:
+                    matrix = matrix.dot(matrix)
+
+            return [int(x) for x in row]
+
+        matrix = [[0] * self.size for _ in range(self.size)]
+        for i, j, m in self.edges:
+            matrix[i][j] = m
+
+        row = [0] * self.size
+        row[self.initial] = 1
+
+        while n:
+            if n & 1:
+                row = _row_times(row, matrix)
+            n >>= 1
+            if n:
+                matrix = [_row_times(r, matrix) for r in matrix]
+
+        return row
+
+
+def _row_times(row: List[int], matrix: List[List[int]]) -> List[int]:
+    result = [0] * len(row)
+    for i, x in enumerate(row):
+        if x:
+            for j, y in enumerate(matrix[i]):
+                if y:
+                    result[j] += x * y
+    return result
+
+
+def count_by_length(fa, max_n: int) -> List[int]:
+    """Retorna uma lista cuja posição k é o número de sentenças de tamanho k
+    aceitas pelo autômato, para k de 0 a max_n.
+
+    Parâmetros:
+    fa    -- o autômato finito
+    max_n -- maior tamanho de sentença
+    """
+    if max_n < 0:
+        return []
+
+    return _count_by_length(TransitionMatrix(fa), max_n)
+
+
+def _vectors(matrix: TransitionMatrix, max_n: int) -> Iterator:
+    # Yields, for each length from 0 to max_n, the vector whose entry i is
+    # the number of sentences of that length accepted from state i. Vectors
+    # are int64 arrays while they cannot overflow, and lists of Python
+    # integers after that.
+    vector = matrix.accept_vector()
+    length = 0
+
+    if numpy is not None:
+        if matrix.max_degree <= 1:
+            safe = max_n
+        else:
+            safe = min(max_n, INT64_BITS // matrix.max_degree.bit_length())
+
+        if matrix.size <= DENSE_LIMIT:
+            dense = matrix.dense(numpy.int64)
+
+            def step(v):
+                return dense.dot(v)
+        else:
+            edges = numpy.array(matrix.edges, dtype=numpy.int64)
+            sources, targets, multiplicities = edges.T
+
+            def step(v):
+                result = numpy.zeros_like(v)
+                numpy.add.at(result, sources, multiplicities * v[targets])
+                return result
+
+        array = numpy.array(vector, dtype=numpy.int64)
+
+        for length in range(safe + 1):
+            if length:
+                array = step(array)
+            yield array
+
+        vector = [int(x) for x in array]
+        length = safe + 1
+
+    # Exact arithmetic with Python integers once int64 could overflow.
+    for length in range(length, max_n + 1):
+        if length:
+            vector = matrix.step(vector)
+        yield vector
+
+
+def _count_by_length(matrix: TransitionMatrix, max_n: int) -> List[int]:
+    return [int(v[matrix.initial]) for v in _vectors(matrix, max_n)]
+
+
+def count_sentences(fa, n: int) -> int:
+    """Retorna o número de sentenças de tamanho n aceitas pelo autômato.
+
+    Parâmetros:
+    fa -- o autômato finito
+    n  -- tamanho das sentenças
+    """
+    if n < 0:
+        return 0
+
+    matrix = TransitionMatrix(fa)
+
+    # Square-and-multiply costs about size^3 * log2(n) operations, while
+    # stepping a vector costs transitions * n.
+    if matrix.size ** 3 * n.bit_length() < len(matrix.edges) * n:
+        row = matrix.power_row(n)
+        return sum(row[i] for i in matrix.accept)
+
+    return _count_by_length(matrix, n)[n]
+
+
+def sample(fa, length: int, k: int,
+           seed: Optional[int] = None) -> List[List]:
+    """Retorna k sentenças de tamanho length sorteadas uniformemente entre as
+    aceitas pelo autômato, como listas de símbolos.
+
+    Cada símbolo é escolhido com probabilidade proporcional ao número de
+    sentenças aceitas que continuam por ele, segundo a tabela de contagens
+    por estado e tamanho restante. O resultado é reproduzível para a mesma
+    semente, mas difere com e sem NumPy.
+
+    Parâmetros:
+    fa     -- o autômato finito
+    length -- tamanho das sentenças
+    k      -- número de sentenças
+    seed   -- semente do gerador de números aleatórios (padrão None)
+    """
+    matrix = TransitionMatrix(fa)
+    table = list(_vectors(matrix, length)) if length >= 0 else []
+
+    if not table or not table[length][matrix.initial]:
+        raise ValueError(
+            'no sentence of length {} is accepted'.format(length))
+
+    if numpy is not None and isinstance(table[length], numpy.ndarray):
+        return _sample_batch(matrix, table, length, k, seed)
+
+    rng = Random(seed)
+    cumulative = {}  # type: Dict[Tuple[int, int], List[int]]
+    sentences = []
+
+    for _ in range(k):
+        state = matrix.initial
+        sentence = []
+
+        for remaining in range(length, 0, -1):
+            key = (state, remaining)
+
+            try:
+                weights = cumulative[key]
+            except KeyError:
+                weights = cumulative[key] = list(accumulate(
+                    int(table[remaining - 1][j]) for _, j in matrix.rows[state]))
+
+            choice = bisect_right(weights, rng.randrange(weights[-1]))
+            symbol, state = matrix.rows[state][choice]
+            sentence.append(symbol)
+
+        sentences.append(sentence)
+
+    return sentences
+
+
+def _sample_batch(matrix: TransitionMatrix, table, length: int, k: int,
+                  seed: Optional[int]) -> List[List]:
+    # Draws all k sentences one position at a time: samples that are in the
+    # same state share one cumulative weight array and one vectorized draw.
+    rng = numpy.random.default_rng(seed)
+
+    symbols = sorted({symbol for row in matrix.rows for symbol, _ in row})
+    symbol_index = {symbol: i for i, symbol in enumerate(symbols)}
+
+    row_symbols = [
+        numpy.array([symbol_index[symbol] for symbol, _ in row],
+                    dtype=numpy.int64)
+        for row in matrix.rows
+    ]
+    row_targets = [
+        numpy.array([j for _, j in row], dtype=numpy.int64)
+        for row in matrix.rows
+    ]
+
+    states = numpy.full(k, matrix.initial, dtype=numpy.int64)
+    drawn = numpy.empty((k, length), dtype=numpy.int64)
+
+    for position in range(length):
+        counts = table[length - position - 1]
+
+        for state in numpy.unique(states):
+            samples = numpy.flatnonzero(states == state)
+            weights = numpy.cumsum(counts[row_targets[state]])
+
+            choices = numpy.searchsorted(
+                weights, rng.integers(0, weights[-1], size=len(samples)),
+                side='right')
+
+            drawn[samples, position] = row_symbols[state][choices]
+            states[samples] = row_targets[state][choices]
+
+    return [[symbols[i] for i in row] for row in drawn.tolist()]
@@ -1,13 +1,28 @@
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from copy import deepcopy
+from enum import Enum, unique
 from itertools import count, product
 from string import ascii_lowercase, ascii_uppercase, digits
-from typing import Dict, FrozenSet, Iterable, Iterator, List, Mapping, NewType, Set, Tuple, Union
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Mapping, NewType, Optional, Set, Tuple, Union
+
+from .cache import cached
+from .stats import current as current_stats, instrumented
 
 
 class MustBeDeterministic(Exception):
     pass
 
 
+@unique
+class Property(Enum):
+    DETERMINISTIC = 1
+    EPSILON_FREE = 2
+    COMPLETE = 3
+    TRIM = 4
+    MINIMAL = 5
+
+
 class Symbol:
     def __init__(self, value: str) -> None:
         if len(value) != 1 or value not in ascii_lowercase + digits + '&':
@@ -57,6 +72,12 @@ class Sentence:
 
 State = NewType('State', str)
 
+ERROR_STATE = State('Qerror')
+
+# Nondeterministic automata with more states than this are reduced with
+# simulation relations once their subset construction outgrows them.
+REDUCTION_THRESHOLD = 32
+
 
 class FiniteAutomaton:
     def __init__(
@@ -72,17 +93,56 @@ class FiniteAutomaton:
         self.initial_state = initial_state
         self.accept_states = set(accept_states)
 
+        # When set, every missing transition over the alphabet leads to a
+        # virtual ERROR_STATE, which only becomes a real state once
+        # materialize_sink() is called.
+        self.implicit_sink = False
+        self.sink_accepting = False
+
+        # Properties known to hold. They are set by the operations that
+        # establish them and discarded by the ones that may break them.
+        self.properties = set()  # type: Set[Property]
+
         for (state, symbol), next_states in transitions.items():
             for next_state in next_states:
                 self.add_transition(state, symbol, next_state)
 
     def add_transition(self, source: State, symbol: Symbol, target: State):
+        if self.implicit_sink and ERROR_STATE in (source, target):
+            self.materialize_sink()
+
+        if self.properties:
+            self._invalidate_properties(source, symbol, target)
+
         self.states.add(source)
         self.alphabet.add(symbol)
         self.states.add(target)
 
-        self._delta.setdefault(source, dict()).setdefault(symbol, set())
-        self._delta[source][symbol].add(target)
+        targets = self._delta.setdefault(source, dict()).setdefault(
+            symbol, set())
+
+        if target not in targets:
+            targets.add(target)
+
+            record = current_stats()
+            if record is not None:
+                record.transitions_added += 1
+
+    def _invalidate_properties(self, source: State, symbol: Symbol,
+                               target: State):
+        if symbol == Symbol('&'):
+            self.properties.discard(Property.DETERMINISTIC)
+            self.properties.discard(Property.EPSILON_FREE)
+        elif target not in self._delta.get(source, {}).get(symbol, {target}):
+            self.properties.discard(Property.DETERMINISTIC)
+
+        if not self.implicit_sink and not (
+                source in self.states and target in self.states
+                and symbol in self.alphabet):
+            self.properties.discard(Property.COMPLETE)
+
+        self.properties.discard(Property.TRIM)
+        self.properties.discard(Property.MINIMAL)
 
     @property
     def transitions(self) -> Dict[Tuple[State, Symbol], Set[State]]:
@@ -104,6 +164,8 @@ class FiniteAutomaton:
         old_transitions = self.transitions
         self._delta = {}
 
+        properties, self.properties = self.properties, set()
+
         for (state, symbol), next_states in old_transitions.items():
             for next_state in next_states:
                 self.add_transition(
@@ -112,6 +174,8 @@ class FiniteAutomaton:
                     table.get(next_state, next_state),
                 )
 
+        self.properties = properties
+
     def prefix_state_names(self, prefix):
         self.rename_states({
             state: '{}{}'.format(prefix, state)
@@ -119,17 +183,51 @@ class FiniteAutomaton:
         })
 
     def reset_state_names(self):
-        trans = {
-            state: 'Q{}'.format(i)
-            for i, state in enumerate(self.states - {self.initial_state}, 1)
-        }
-        trans[self.initial_state] = 'Q0'
-        self.rename_states(trans)
+        # Breadth-first numbering from the initial state over the sorted
+        # alphabet, followed by the unreachable states in sorted order.
+        order = [self.initial_state]
+        seen = {self.initial_state}
+
+        for state in order:
+            t = self._delta.get(state, {})
+
+            for symbol in sorted(t):
+                for next_state in sorted(t[symbol]):
+                    if next_state not in seen:
+                        seen.add(next_state)
+                        order.append(next_state)
+
+        order.extend(sorted(self.states - seen))
+
+        self.rename_states({
+            state: State('Q{}'.format(i))
+            for i, state in enumerate(order)
+        })
+
+    def canonical(self) -> 'FiniteAutomaton':
+        fa = self.determinize().minimize()
+        fa.reset_state_names()
+        return fa
+
+    def canonical_hash(self) -> str:
+        fa = self.canonical()
+
+        h = hashlib.sha256()
+        h.update(repr(sorted(fa.accept_states)).encode('utf-8'))
+
+        for state in sorted(fa._delta):
+            t = fa._delta[state]
+            for symbol in sorted(t):
+                h.update(repr(
+                    (state, symbol.value, sorted(t[symbol]))).encode('utf-8'))
+
+        return h.hexdigest()
 
     def to_regular_grammar(self):
         from .regular_grammar import RegularGrammar
 
         fa = self.copy()
+        fa._resolve_sink()
 
         relevant_states = {
             state
@@ -184,7 +282,11 @@ class FiniteAutomaton:
 
         return RegularGrammar(production_rules, start_symbol='S')
 
+    @instrumented
     def remove_epsilon_transitions(self):
+        if Property.EPSILON_FREE in self.properties:
+            return
+
         def epsilon_star(state, epsilon_set=None):
             if epsilon_set is None:
                 epsilon_set = set()
@@ -193,7 +295,8 @@ class FiniteAutomaton:
             try:
                 next_state = self._delta[state][Symbol('&')]
                 for nxt in next_state:
-                    epsilon_star(nxt, epsilon_set)
+                    if nxt not in epsilon_set:
+                        epsilon_star(nxt, epsilon_set)
             except KeyError:
                 return epsilon_set
 
@@ -214,74 +317,214 @@ class FiniteAutomaton:
                 if next_state in self.accept_states:
                     self.accept_states.add(state)
 
-    def determinize(self) -> 'FiniteAutomaton':
+        self.properties.add(Property.EPSILON_FREE)
+        self.properties.discard(Property.TRIM)
+        self.properties.discard(Property.MINIMAL)
+
+    @instrumented
+    @cached
+    def determinize(self, memory_limit: Optional[int] = None,
+                    checkpoint: Optional[str] = None,
+                    workers: Optional[int] = None) -> 'FiniteAutomaton':
+        if self.is_deterministic():
+            return self.copy()
+
+        if workers is not None and workers > 1:
+            if memory_limit is not None or checkpoint is not None:
+                raise ValueError(
+                    'workers cannot be combined with memory_limit or '
+                    'checkpoint')
+
+            from .parallel import determinize
+            return determinize(self, workers)
+
+        if memory_limit is not None or checkpoint is not None:
+            from .spill import determinize
+            return determinize(self, memory_limit, checkpoint)
+
+        fa, subsets = self._prepared()
+        if subsets is None:
+            subsets = fa._subsets()
+
+        new_initial_state, new_states, new_transitions = subsets
+
+        new_fa = FiniteAutomaton(
+            new_transitions,
+            new_initial_state,
+            {
+                state
+                for state in new_states
+                if state.intersection(fa.accept_states)
+            }
+        )
+        new_fa.states.add(new_initial_state)
+        new_fa.alphabet.update(
+            symbol for symbol in fa.alphabet if symbol != Symbol('&'))
+
+        new_fa.reset_state_names()
+        new_fa.properties.update(
+            {Property.DETERMINISTIC, Property.EPSILON_FREE})
+        return new_fa
+
+    def _prepared(self):
+        # Epsilon-free copy without the virtual sink for the subset
+        # constructions. Large automata are first determinized with at most
+        # as many subsets as states; only if that gives up are they reduced
+        # with simulations, so every construction reduces the same inputs.
+        # Returns the copy and the subsets of that attempt, if it finished.
         fa = self.copy()
+        fa._resolve_sink()
         fa.remove_epsilon_transitions()
 
-        new_initial_state = frozenset({fa.initial_state})
+        if len(fa.states) <= REDUCTION_THRESHOLD:
+            return fa, None
+
+        subsets = fa._subsets(len(fa.states))
+        if subsets is None:
+            from .simulation import reduce
+            fa = reduce(fa)
+
+        return fa, subsets
+
+    def _subsets(self, limit: Optional[int] = None):
+        # Subset construction, given up once it has built more than limit
+        # subsets.
+        symbol_classes = self.symbol_classes()
+
+        new_initial_state = frozenset({self.initial_state})
         pending_states = {new_initial_state}
         new_states = set()  # type: Set[FrozenSet[State]]
 
         new_transitions = {}
+        record = current_stats()
 
         while pending_states:
+            if limit is not None and len(new_states) > limit:
+                return None
+
             states = pending_states.pop()
 
-            for symbol in fa.alphabet:
+            if record is not None:
+                record.subset(len(states))
+
+            for symbol_class in symbol_classes:
                 next_states = frozenset({
                     next_state
                     for state in states
-                    for next_state in fa.transitate(state, symbol)
+                    for next_state in self.transitate(state, min(symbol_class))
                 })
 
                 if not next_states:
                     continue
-                new_transitions[(states, symbol)] = {next_states}
+                for symbol in symbol_class:
+                    new_transitions[(states, symbol)] = {next_states}
 
                 if next_states != states and next_states not in new_states:
                     pending_states.add(next_states)
 
             new_states.add(states)
 
-        new_fa = FiniteAutomaton(
-            new_transitions,
-            new_initial_state,
-            {
-                state
-                for state in new_states
-                if state.intersection(fa.accept_states)
-            }
-        )
+        return new_initial_state, new_states, new_transitions
+
+    def _numbered(self):
+        # The automaton of _prepared, for the subset constructions that
+        # work on numbered states. Returns it, the number of the initial
+        # state, the numbers of the accept states, the symbol classes and,
+        # for each class, the successors of each state.
+        fa, _ = self._prepared()
+
+        states = sorted(
+            fa.states | {fa.initial_state} |
+            {s for t in fa._delta.values() for ns in t.values() for s in ns})
+        index = {state: i for i, state in enumerate(states)}
+        accepting = {index[s] for s in fa.accept_states if s in index}
+        symbol_classes = fa.symbol_classes()
+
+        moves = [
+            [
+                [index[s] for s in fa.transitate(state, min(symbol_class))]
+                for state in states
+            ]
+            for symbol_class in symbol_classes
+        ]
+
+        return fa, index[fa.initial_state], accepting, symbol_classes, moves
+
+    def _from_subsets(self, symbol_classes: List[FrozenSet[Symbol]],
+                      size: int, accept_ids: Iterable[int],
+                      transitions: Iterable[Tuple[int, int, int]]
+                      ) -> 'FiniteAutomaton':
+        # Deterministic automaton over the alphabet of self whose states are
+        # subsets numbered from 0, the initial one, to size - 1, with
+        # transitions given as (source, symbol class, target).
+        def name(subset_id):
+            return State('Q{}'.format(subset_id))
+
+        new_fa = FiniteAutomaton({}, name(0), map(name, accept_ids))
+        new_fa.states.update(name(i) for i in range(size))
+        new_fa.alphabet.update(
+            symbol for symbol in self.alphabet if symbol != Symbol('&'))
+
+        for source, c, target in transitions:
+            t = new_fa._delta.setdefault(name(source), {})
+            for symbol in symbol_classes[c]:
+                t[symbol] = {name(target)}
 
         new_fa.reset_state_names()
+        new_fa.properties.update(
+            {Property.DETERMINISTIC, Property.EPSILON_FREE})
         return new_fa
 
+    @instrumented
+    @cached
+    def reduce(self) -> 'FiniteAutomaton':
+        from .simulation import reduce
+        return reduce(self)
+
     def discard_state(self, state: State):
+        if not self.implicit_sink:
+            self.properties.discard(Property.COMPLETE)
+        self.properties.discard(Property.TRIM)
+        self.properties.discard(Property.MINIMAL)
+
         self._delta.pop(state, None)
         self.states.discard(state)
         self.accept_states.discard(state)
 
-        for _, next_states in self.transitions.items():
-            next_states.discard(state)
+        for t in self._delta.values():
+            for symbol in [s for s, ns in t.items() if state in ns]:
+                t[symbol].discard(state)
+                if not t[symbol]:
+                    del t[symbol]
 
+    @instrumented
+    @cached
     def minimize(self) -> 'FiniteAutomaton':
         if not self.is_deterministic():
             raise MustBeDeterministic()
 
-        fa = self.copy()
-        fa.remove_unreachable_states()
-        fa.remove_dead_states()
+        if Property.MINIMAL in self.properties:
+            return self.copy()
 
-        if fa.initial_state is None:
+        if self.is_empty():
             q0 = State('Q0')
-            return FiniteAutomaton(
-                q0,
-                {(q0, s): q0 for s in self.alphabet},
-                q0,
-                set()
-            )
-
-        fa.remove_equivalent_states()
+            fa = FiniteAutomaton({}, q0, set())
+            fa.states.add(q0)
+            fa.alphabet = {
+                symbol for symbol in self.alphabet if symbol != Symbol('&')}
+        else:
+            fa = self.copy()
+            fa._resolve_sink()
+            fa.remove_unreachable_states()
+            fa.remove_dead_states()
+            fa.remove_equivalent_states()
+
+        fa.properties.update({
+            Property.DETERMINISTIC,
+            Property.EPSILON_FREE,
+            Property.TRIM,
+            Property.MINIMAL,
+        })
         return fa
 
     def remove_unreachable_states(self):
@@ -304,11 +547,16 @@ class FiniteAutomaton:
         self.states = reachable
 
     def remove_dead_states(self):
+        self._resolve_sink()
+
         for state in self.states.copy():
             if self.is_dead(state):
                 self.discard_state(state)
 
     def is_dead(self, state: State, reached=None) -> bool:
+        if self.implicit_sink and self.sink_accepting:
+            return self._without_sink().is_dead(state, reached)
+
         if state in self.accept_states:
             return False
 
@@ -326,20 +574,28 @@ class FiniteAutomaton:
         return True
 
     def remove_equivalent_states(self):
-        from pprint import pprint
-        print()
-        pprint(self._delta)
-        pprint(self.accept_states)
         partitions = {
-            frozenset(self.states - self.accept_states),
-            frozenset(self.accept_states),
+            partition
+            for partition in (
+                frozenset(self.states - self.accept_states),
+                frozenset(self.accept_states),
+            )
+            if partition
         }
-        pending = {frozenset(self.accept_states)}
+        # Missing transitions are not backed by a sink state here, so
+        # every block has to be used as a splitter.
+        pending = set(partitions)
+
+        symbols = [min(symbol_class) for symbol_class in self.symbol_classes()]
+        record = current_stats()
 
         while pending:
             p = pending.pop()
 
-            for symbol in self.alphabet:
+            if record is not None:
+                record.refinement_rounds += 1
+
+            for symbol in symbols:
                 x = {
                     s for s in self.states
                     if p & self.transitate(s, symbol)
@@ -356,83 +612,252 @@ class FiniteAutomaton:
                     partitions.add(frozenset(foo))
                     partitions.add(frozenset(bar))
 
-                    if y in pending:
-                        pending.remove(y)
-                        pending.add(frozenset(foo))
-                        pending.add(frozenset(bar))
-                    else:
-                        pending.add(frozenset(min(foo, bar, key=len)))
+                    pending.discard(y)
+                    pending.add(frozenset(foo))
+                    pending.add(frozenset(bar))
 
         for partition in partitions:
-            state, *others = partition
-            for other_state in others:
+            if self.initial_state in partition:
+                state = self.initial_state
+            else:
+                state = min(partition)
+
+            for other_state in sorted(partition - {state}):
                 self._merge_states(state, other_state)
 
     def _merge_states(self, keep: State, discard: State):
-        if discard == self.initial_state or keep not in self.states:
-            keep, discard = discard, keep
-
         for (state, symbol), next_states in self.transitions.items():
             if discard in next_states:
                 self.add_transition(state, symbol, keep)
 
         self.discard_state(discard)
 
+    def symbol_classes(self) -> List[FrozenSet[Symbol]]:
+        epsilon = Symbol('&')
+
+        columns = {
+            symbol: set()
+            for symbol in self.alphabet
+            if symbol != epsilon
+        }  # type: Dict[Symbol, Set[Tuple[State, FrozenSet[State]]]]
+
+        for state, t in self._delta.items():
+            for symbol, next_states in t.items():
+                if symbol != epsilon:
+                    columns[symbol].add((state, frozenset(next_states)))
+
+        classes = {}  # type: Dict[FrozenSet, Set[Symbol]]
+        for symbol, column in columns.items():
+            classes.setdefault(frozenset(column), set()).add(symbol)
+
+        return sorted((frozenset(c) for c in classes.values()), key=min)
+
     def transitate(self, state: State, symbol: Symbol) -> Set[State]:
-        return self._delta.get(state, {}).get(symbol, set())
+        next_states = self._delta.get(state, {}).get(symbol)
+
+        if next_states is not None:
+            return next_states
+
+        if (self.implicit_sink and symbol in self.alphabet
+                and symbol != Symbol('&')):
+            return {ERROR_STATE}
+
+        return set()
+
+    def is_accepting(self, state: State) -> bool:
+        if state in self.accept_states:
+            return True
+
+        return (state == ERROR_STATE and self.implicit_sink
+                and self.sink_accepting)
 
     def evaluate(self, sentence: Sentence) -> bool:
-        current_states = {self.initial_state}
+        # Epsilon transitions are followed after every symbol read.
+        closure = (self._epsilon_closure if Symbol('&') in self.alphabet
+                   else set)
+        current_states = closure({self.initial_state})
 
         for symbol in sentence:
-            current_states = {
+            current_states = closure({
                 next_state
                 for state in current_states
                 for next_state in self.transitate(state, symbol)
-            }
+            })
 
-        return any(state in self.accept_states
+        return any(self.is_accepting(state)
                    for state in current_states)
 
     def gen_sentences(self, length: int) -> List[Sentence]:
-        current_iteration = {(self.initial_state, '')}
-
-        for i in range(length):
-            next_iteration = set()
+        return list(self.sentences(length, min_length=length))
+
+    def sentences(self, max_length: Optional[int] = None,
+                  min_length: int = 0) -> Iterator[Sentence]:
+        initial_state, rows, accept_states = self._reachable_rows()
+
+        predecessors = {}  # type: Dict[State, Set[State]]
+        for state, row in rows.items():
+            for _, next_state in row:
+                predecessors.setdefault(next_state, set()).add(state)
+
+        # levels[k] holds the states from which some sentence of exactly k
+        # symbols is accepted. Once a level is empty, so are all the next
+        # ones, and no longer sentence exists.
+        levels = [accept_states]
+        length = 0
+
+        while max_length is None or length <= max_length:
+            level = levels[length]
+            if not level:
+                return
+
+            if length >= min_length and initial_state in level:
+                yield from self._sentences_of_length(
+                    initial_state, rows, levels, length)
+
+            levels.append({
+                previous_state
+                for state in level
+                for previous_state in predecessors.get(state, ())
+            })
+            length += 1
+
+    @staticmethod
+    def _sentences_of_length(initial_state, rows, levels, length):
+        # Depth-first search in symbol order that only follows transitions
+        # into states that can still reach acceptance with the symbols left,
+        # so every branch ends in at least one sentence.
+        prefix = []  # type: List[Symbol]
+        stack = [iter(rows[initial_state])]
+
+        if length == 0:
+            yield Sentence(prefix)
+            return
+
+        while stack:
+            remaining = length - len(prefix) - 1
+
+            for symbol, next_state in stack[-1]:
+                if next_state in levels[remaining]:
+                    break
+            else:
+                stack.pop()
+                if prefix:
+                    prefix.pop()
+                continue
+
+            prefix.append(symbol)
+
+            if remaining == 0:
+                yield Sentence(list(prefix))
+                prefix.pop()
+            else:
+                stack.append(iter(rows[next_state]))
+
+    def count_sentences(self, n: int) -> int:
+        from .counting import count_sentences
+        return count_sentences(self, n)
+
+    def count_by_length(self, max_n: int) -> List[int]:
+        from .counting import count_by_length
+        return count_by_length(self, max_n)
+
+    def sample(self, length: int, k: int,
+               seed: Optional[int] = None) -> List[Sentence]:
+        from .counting import sample
+        return [Sentence(symbols) for symbols in sample(self, length, k, seed)]
+
+    def _reachable_rows(self):
+        # The deterministic automaton as rows of (symbol, next state) in
+        # symbol order, restricted to the states reachable from the initial
+        # one.
+        fa = self.determinize()._without_sink()
+
+        rows = {}  # type: Dict[State, List[Tuple[Symbol, State]]]
+        pending = [fa.initial_state]
 
-            for state, sentence in current_iteration:
-                for symbol, next_states in self._delta.get(state, {}).items():
-                    if symbol != '&':
-                        new_sentence = sentence + str(symbol)
-
-                    for next_state in next_states:
-                        next_iteration.add((next_state, new_sentence))
-
-            current_iteration = next_iteration
+        while pending:
+            state = pending.pop()
+            if state in rows:
+                continue
 
-            if not next_iteration:
-                break
+            row = rows[state] = sorted(
+                (symbol, next(iter(next_states)))
+                for symbol, next_states in fa._delta.get(state, {}).items()
+                if next_states
+            )
+            pending.extend(next_state for _, next_state in row)
 
-        return [
-            Sentence(sentence)
-            for state, sentence in current_iteration
-            if state in self.accept_states
-        ]
+        accept_states = {state for state in rows if fa.is_accepting(state)}
+        return fa.initial_state, rows, accept_states
 
     def complete(self):
-        error_state = State('Qerror')
+        if self.implicit_sink or Property.COMPLETE in self.properties:
+            return
+
+        # A real ERROR_STATE can only stand for the virtual sink if it is a
+        # rejecting sink itself; otherwise it gets another name.
+        if ERROR_STATE in self.states and (
+                ERROR_STATE in self.accept_states or
+                any(next_states - {ERROR_STATE} for next_states
+                    in self._delta.get(ERROR_STATE, {}).values())):
+            names = (State('{}{}'.format(ERROR_STATE, i)) for i in count(1))
+            self.rename_states({ERROR_STATE: next(
+                name for name in names if name not in self.states)})
+
+        self.implicit_sink = True
+        self.sink_accepting = False
+        self.properties.add(Property.COMPLETE)
+
+        if ERROR_STATE in self.states:
+            self.materialize_sink()
+
+    def materialize_sink(self):
+        if not self.implicit_sink:
+            return
+
+        accepting = self.sink_accepting
+        self.implicit_sink = False
+        self.sink_accepting = False
+
+        symbol_classes = self.symbol_classes()
+
+        for symbol_class, state in product(symbol_classes, self.states.copy()):
+            if min(symbol_class) not in self._delta.get(state, {}):
+                for symbol in symbol_class:
+                    self.add_transition(state, symbol, ERROR_STATE)
+
+        if ERROR_STATE in self.states:
+            for symbol_class in symbol_classes:
+                for symbol in symbol_class:
+                    self.add_transition(ERROR_STATE, symbol, ERROR_STATE)
+
+            if accepting:
+                self.accept_states.add(ERROR_STATE)
+
+        self.properties.add(Property.COMPLETE)
+
+    def _resolve_sink(self):
+        # A rejecting sink can be dropped without changing the language.
+        if self.sink_accepting:
+            self.materialize_sink()
+        elif self.implicit_sink:
+            self.implicit_sink = False
+            self.properties.discard(Property.COMPLETE)
+
+    def _without_sink(self) -> 'FiniteAutomaton':
+        if not (self.implicit_sink and self.sink_accepting):
+            return self
 
-        current_transitions = self.transitions
-        for state, symbol in product(self.states.copy(), self.alphabet):
-            if (state, symbol) not in current_transitions:
-                self.add_transition(state, symbol, error_state)
-
-        if error_state in self.states:
-            for symbol in self.alphabet:
-                self.add_transition(error_state, symbol, error_state)
+        fa = self.copy()
+        fa.materialize_sink()
+        return fa
 
+    @instrumented
+    @cached
     def reverse(self) -> 'FiniteAutomaton':
         fa = self.copy()
+        fa._resolve_sink()
+        fa.properties.clear()
         old_transitions = fa.transitions
         fa._delta = {}
 
@@ -446,14 +871,21 @@ class FiniteAutomaton:
         for state in fa.accept_states:
             fa._replicate_transitions(state, new_initial_state)
 
-        fa.accept_states = {fa.initial_state}
+        if fa.initial_state in fa.accept_states:
+            fa.accept_states = {fa.initial_state, new_initial_state}
+        else:
+            fa.accept_states = {fa.initial_state}
         fa.initial_state = new_initial_state
         fa.reset_state_names()
 
         return fa
 
+    @instrumented
+    @cached
     def kleene_star(self) -> 'FiniteAutomaton':
         fa = self.copy()
+        fa._resolve_sink()
+        fa.properties.clear()
 
         for state in fa.accept_states:
             fa._replicate_transitions(fa.initial_state, state)
@@ -465,27 +897,279 @@ class FiniteAutomaton:
         if not isinstance(other, FiniteAutomaton):
             return NotImplemented
 
-        fa = self.intersection(other.negate())
-        return fa.is_dead(fa.initial_state)
+        return self.is_subset(other) and other.is_subset(self)
+
+    def is_subset(self, other: 'FiniteAutomaton') -> bool:
+        return self.inclusion_counterexample(other) is None
+
+    def is_universal(self, alphabet: Optional[Iterable[Symbol]] = None
+                     ) -> bool:
+        if alphabet is None:
+            alphabet = self.alphabet
+
+        q0 = State('Q0')
+        everything = FiniteAutomaton({}, q0, [q0])
+        everything.states.add(q0)
+
+        for symbol in alphabet:
+            if symbol != Symbol('&'):
+                everything.add_transition(q0, symbol, q0)
+
+        return everything.is_subset(self)
+
+    def inclusion_counterexample(self, other: 'FiniteAutomaton'
+                                 ) -> Optional[Sentence]:
+        # Breadth-first search over pairs (p, S) of a state of self and a
+        # state of the subset construction of other, built on the fly. A
+        # pair whose S contains the S of another pair with the same p can
+        # only reject less, so only the antichain of minimal subsets is
+        # explored.
+        fa = self
+        if fa.implicit_sink:
+            fa = fa.copy()
+            fa._resolve_sink()
+
+        other_steps = {}  # type: Dict[Tuple[FrozenSet[State], Symbol], FrozenSet[State]]
+
+        def other_step(subset, symbol):
+            try:
+                return other_steps[(subset, symbol)]
+            except KeyError:
+                pass
+
+            next_subset = other._epsilon_closure(
+                next_state
+                for state in subset
+                for next_state in other.transitate(state, symbol)
+            )
+            other_steps[(subset, symbol)] = next_subset
+            return next_subset
+
+        antichain = {}  # type: Dict[State, List[FrozenSet[State]]]
+        # Pairs, with the index of the pair they came from and the symbol
+        # read, so that the counterexample can be rebuilt.
+        pairs = []  # type: List[Tuple[State, FrozenSet[State], int, Optional[Symbol]]]
+
+        def visit(state, subset, parent, symbol):
+            chain = antichain.setdefault(state, [])
+
+            if any(smaller <= subset for smaller in chain):
+                return False
+
+            chain[:] = [s for s in chain if not subset <= s]
+            chain.append(subset)
+            pairs.append((state, subset, parent, symbol))
+
+            return (state in fa.accept_states and
+                    not any(other.is_accepting(s) for s in subset))
+
+        def counterexample():
+            symbols = []
+            _, _, parent, symbol = pairs[-1]
+
+            while symbol is not None:
+                symbols.append(symbol)
+                _, _, parent, symbol = pairs[parent]
+
+            return Sentence(reversed(symbols))
+
+        initial_subset = other._epsilon_closure([other.initial_state])
+
+        for state in sorted(fa._epsilon_closure([fa.initial_state])):
+            if visit(state, initial_subset, -1, None):
+                return counterexample()
+
+        i = 0
+        while i < len(pairs):
+            state, subset, _, _ = pairs[i]
+
+            for symbol, next_states in sorted(fa._delta.get(state, {}).items()):
+                if symbol == Symbol('&') or not next_states:
+                    continue
+
+                next_subset = other_step(subset, symbol)
+
+                for next_state in sorted(fa._epsilon_closure(next_states)):
+                    if visit(next_state, next_subset, i, symbol):
+                        return counterexample()
+
+            i += 1
+
+        return None
+
+    def _epsilon_closure(self, states: Iterable[State]) -> FrozenSet[State]:
+        epsilon = Symbol('&')
+        closure = set(states)
+        pending = list(closure)
+
+        while pending:
+            state = pending.pop()
+
+            for next_state in self._delta.get(state, {}).get(epsilon, ()):
+                if next_state not in closure:
+                    closure.add(next_state)
+                    pending.append(next_state)
+
+        return frozenset(closure)
+
+    def is_empty(self) -> bool:
+        return self.shortest_accepted() is None
+
+    def shortest_accepted(self) -> Optional[Sentence]:
+        return FiniteAutomaton._shortest_common([self])
+
+    def intersects(self, other: 'FiniteAutomaton') -> bool:
+        return FiniteAutomaton._shortest_common([self, other]) is not None
+
+    @staticmethod
+    def _shortest_common(automata: List['FiniteAutomaton']
+                         ) -> Optional[Sentence]:
+        # Breadth-first search over tuples with one state of each automaton,
+        # that is, over their product built on the fly. It stops at the
+        # first tuple in which every state accepts. Each level is expanded
+        # in the order of the sentences read so far, so the sentence found
+        # is the first accepted by all of them in shortlex order.
+        first, rest = automata[0], automata[1:]
+        closures = [{} for _ in automata]  # type: List[Dict[State, FrozenSet[State]]]
+
+        def closure(i, state):
+            try:
+                return closures[i][state]
+            except KeyError:
+                c = closures[i][state] = automata[i]._epsilon_closure([state])
+                return c
+
+        # Nodes, with the index of the node they came from, the symbol read
+        # and the rank of the sentence read among the ones of its level.
+        nodes = []  # type: List[Tuple[Tuple[State, ...], int, Optional[Symbol], int]]
+        visited = set()  # type: Set[Tuple[State, ...]]
+
+        def visit(targets, parent, symbol, rank):
+            for node in product(*(
+                    sorted(frozenset().union(*(closure(i, t) for t in ts)))
+                    for i, ts in enumerate(targets))):
+                if node in visited:
+                    continue
+
+                visited.add(node)
+                nodes.append((node, parent, symbol, rank))
+
+                if all(fa.is_accepting(state)
+                       for fa, state in zip(automata, node)):
+                    return True
+
+            return False
+
+        def sentence():
+            symbols = []
+            _, parent, symbol, _ = nodes[-1]
+
+            while symbol is not None:
+                symbols.append(symbol)
+                _, parent, symbol, _ = nodes[parent]
+
+            return Sentence(reversed(symbols))
 
-    def negate(self):
+        if visit([[fa.initial_state] for fa in automata], -1, None, 0):
+            return sentence()
+
+        level = range(len(nodes))
+        while level:
+            moves = []
+            for i in level:
+                node, _, _, rank = nodes[i]
+
+                for symbol, next_states in first._moves(node[0]):
+                    targets = [next_states]
+
+                    for fa, state in zip(rest, node[1:]):
+                        targets.append(fa.transitate(state, symbol))
+                        if not targets[-1]:
+                            break
+                    else:
+                        moves.append((rank, symbol, i, targets))
+
+            moves.sort(key=lambda move: move[:2])
+
+            start = len(nodes)
+            rank = -1
+            last = None
+            for parent_rank, symbol, i, targets in moves:
+                if (parent_rank, symbol) != last:
+                    last = (parent_rank, symbol)
+                    rank += 1
+
+                if visit(targets, i, symbol, rank):
+                    return sentence()
+
+            level = range(start, len(nodes))
+
+        return None
+
+    def _moves(self, state: State) -> List[Tuple[Symbol, Set[State]]]:
+        # Transitions that may lead to acceptance, in symbol order. A
+        # rejecting virtual sink is dead, so only an accepting one adds the
+        # missing transitions.
+        epsilon = Symbol('&')
+        moves = {
+            symbol: next_states
+            for symbol, next_states in self._delta.get(state, {}).items()
+            if symbol != epsilon and next_states
+        }
+
+        if self.implicit_sink and self.sink_accepting:
+            for symbol in self.alphabet - moves.keys():
+                if symbol != epsilon:
+                    moves[symbol] = {ERROR_STATE}
+
+        return sorted(moves.items())
+
+    @instrumented
+    @cached
+    def negate(self, alphabet: Optional[Iterable[Symbol]] = None):
         fa = self.determinize()
+
+        if alphabet is not None:
+            new_symbols = {
+                symbol for symbol in alphabet
+                if symbol != Symbol('&')} - fa.alphabet
+
+            # The new symbols must be rejected before the complement, so an
+            # accepting sink cannot receive them.
+            if new_symbols:
+                if fa.sink_accepting:
+                    fa.materialize_sink()
+                if not fa.implicit_sink:
+                    fa.properties.discard(Property.COMPLETE)
+                fa.alphabet.update(new_symbols)
+
         fa.complete()
         fa.accept_states = fa.states - fa.accept_states
+        fa.properties.discard(Property.TRIM)
+        fa.properties.discard(Property.MINIMAL)
+
+        if fa.implicit_sink:
+            fa.sink_accepting = not fa.sink_accepting
+
         return fa
 
+    @instrumented
+    @cached
     def intersection(self, other):
-        n_fa1 = self.negate()
-        n_fa2 = other.negate()
+        alphabet = self.alphabet | other.alphabet
+        n_fa1 = self.negate(alphabet)
+        n_fa2 = other.negate(alphabet)
 
         n_fa12 = n_fa1.union(n_fa2)
 
         fa_intersection = n_fa12.negate()
         return fa_intersection
 
+    @instrumented
+    @cached
     def difference(self, other):
         fa1 = self.copy()
-        n_fa2 = other.negate()
+        n_fa2 = other.negate(self.alphabet | other.alphabet)
 
         fa_difference = fa1.intersection(n_fa2)
         return fa_difference
@@ -495,54 +1179,274 @@ class FiniteAutomaton:
             for next_state in next_states:
                 self.add_transition(to_state, symbol, next_state)
 
-    def union(self, other: 'FiniteAutomaton') -> 'FiniteAutomaton':
-        fa1 = self.copy()
-        fa1.prefix_state_names('fa1_')
+    def _absorb(self, other: 'FiniteAutomaton', table: Mapping[State, State]):
+        self.states.update(table.values())
+        self.alphabet.update(other.alphabet)
 
-        fa2 = other.copy()
-        fa2.prefix_state_names('fa2_')
+        for state, t in other._delta.items():
+            for symbol, next_states in t.items():
+                for next_state in next_states:
+                    self.add_transition(table[state], symbol, table[next_state])
+
+    @staticmethod
+    def _split(automata: List['FiniteAutomaton'], workers: Optional[int]):
+        if not workers or workers < 2 or len(automata) <= workers:
+            return None
+
+        size = -(-len(automata) // workers)
+        return [automata[i:i + size] for i in range(0, len(automata), size)]
+
+    @classmethod
+    @instrumented
+    @cached
+    def union_all(
+            cls,
+            automata: Iterable['FiniteAutomaton'],
+            workers: Optional[int] = None,
+    ) -> 'FiniteAutomaton':
+        automata = list(automata)
+
+        chunks = cls._split(automata, workers)
+        if chunks is not None:
+            with ProcessPoolExecutor(workers) as executor:
+                automata = list(executor.map(cls.union_all, chunks))
+
+        initial_state = State('Q0')
+        fa = cls({}, initial_state, set())
+        fa.states.add(initial_state)
+
+        names = count(1)
+        for other in automata:
+            other = other._without_sink()
+            table = {
+                state: State('Q{}'.format(next(names)))
+                for state in other.states | {other.initial_state}
+            }
+            fa._absorb(other, table)
 
-        for (state, symbol), next_states in fa2.transitions.items():
-            for next_state in next_states:
-                fa1.add_transition(state, symbol, next_state)
+            fa.accept_states.update(table[s] for s in other.accept_states)
+            if other.initial_state in other.accept_states:
+                fa.accept_states.add(initial_state)
 
-        initial_state = State('q0')
-        fa1.states.add(initial_state)
+            fa._replicate_transitions(table[other.initial_state], initial_state)
 
-        if (fa1.initial_state in fa1.accept_states or
-                fa2.initial_state in fa2.accept_states):
-            fa1.accept_states.add(initial_state)
+        return fa
 
-        fa1.accept_states.update(fa2.accept_states)
+    @classmethod
+    @instrumented
+    @cached
+    def concatenate_all(
+            cls,
+            automata: Iterable['FiniteAutomaton'],
+            workers: Optional[int] = None,
+    ) -> 'FiniteAutomaton':
+        automata = list(automata)
+
+        chunks = cls._split(automata, workers)
+        if chunks is not None:
+            with ProcessPoolExecutor(workers) as executor:
+                automata = list(executor.map(cls.concatenate_all, chunks))
+
+        initial_state = State('Q0')
+        fa = cls({}, initial_state, set())
+        fa.states.add(initial_state)
+
+        # States where the next automaton is attached: the accept states of
+        # the concatenation built so far.
+        tails = {initial_state}
+
+        names = count(1)
+        for other in automata:
+            other = other._without_sink()
+            table = {
+                state: State('Q{}'.format(next(names)))
+                for state in other.states | {other.initial_state}
+            }
+            fa._absorb(other, table)
 
-        fa1._replicate_transitions(fa1.initial_state, initial_state)
-        fa1._replicate_transitions(fa2.initial_state, initial_state)
+            for state in tails:
+                fa._replicate_transitions(table[other.initial_state], state)
 
-        fa1.initial_state = initial_state
+            accept_states = {table[s] for s in other.accept_states}
+            if other.initial_state in other.accept_states:
+                tails = tails | accept_states
+            else:
+                tails = accept_states
 
-        fa1.reset_state_names()
-        return fa1
+        fa.accept_states = set(tails)
+        return fa
 
-    def concatenate(self, other: 'FiniteAutomaton') -> 'FiniteAutomaton':
-        fa1 = self.copy()
-        fa1.prefix_state_names('fa1_')
+    @classmethod
+    @instrumented
+    @cached
+    def intersection_all(
+            cls,
+            automata: Iterable['FiniteAutomaton'],
+    ) -> 'FiniteAutomaton':
+        automata = [
+            fa if fa.is_deterministic() else fa.determinize()
+            for fa in automata
+        ]
 
-        fa2 = other.copy()
-        fa2.prefix_state_names('fa2_')
+        if not automata:
+            raise ValueError('intersection_all needs at least one automaton')
 
-        for (state, symbol), next_states in fa2.transitions.items():
-            for next_state in next_states:
-                fa1.add_transition(state, symbol, next_state)
+        # Product of the deterministic automata, built from the initial
+        # tuple of states. Tuples in which some automaton has no transition,
+        # or reaches its rejecting sink, are never created.
+        first, rest = automata[0], automata[1:]
+        initial = tuple(fa.initial_state for fa in automata)
+        names = {initial: State('Q0')}
+        order = [initial]
+
+        fa = cls({}, names[initial], set())
+        for other in automata:
+            fa.alphabet.update(other.alphabet)
+        fa.alphabet.discard(Symbol('&'))
+
+        for node in order:
+            source = names[node]
 
-        for state in fa1.accept_states:
-            fa1._replicate_transitions(fa2.initial_state, state)
+            if all(a.is_accepting(s) for a, s in zip(automata, node)):
+                fa.accept_states.add(source)
 
-        fa1.accept_states = fa2.accept_states
+            t = {}  # type: Dict[Symbol, Set[State]]
+            for symbol, next_states in first._moves(node[0]):
+                targets = [next(iter(next_states))]
 
-        fa1.reset_state_names()
-        return fa1
+                for other, state in zip(rest, node[1:]):
+                    next_states = other._delta.get(state, {}).get(symbol)
+
+                    if next_states:
+                        targets.append(next(iter(next_states)))
+                    elif (other.implicit_sink and other.sink_accepting
+                          and symbol in other.alphabet):
+                        targets.append(ERROR_STATE)
+                    else:
+                        break
+                else:
+                    target = tuple(targets)
+                    name = names.get(target)
+                    if name is None:
+                        name = names[target] = State('Q{}'.format(len(names)))
+                        order.append(target)
+                    t[symbol] = {name}
+
+            if t:
+                fa._delta[source] = t
+
+        fa.states = set(names.values())
+        fa.properties.update({Property.DETERMINISTIC, Property.EPSILON_FREE})
+        return fa
+
+    @classmethod
+    @instrumented
+    def from_words(
+            cls,
+            words: Iterable[Union[str, Sentence]],
+    ) -> 'FiniteAutomaton':
+        # Incremental construction of the minimal acyclic automaton (Daciuk
+        # et al.). Words must come in sorted order, so once a word diverges
+        # from the previous one, the previous word's suffix is final and its
+        # states can be merged with equivalent ones from the register.
+        children = {0: {}}  # type: Dict[int, Dict[str, int]]
+        final = set()  # type: Set[int]
+        register = {}  # type: Dict[Tuple, int]
+        names = count(1)
+
+        def replace_or_register(path, word, depth):
+            for i in range(len(word), depth, -1):
+                node = path[i]
+                signature = (
+                    node in final, tuple(sorted(children[node].items())))
+
+                equivalent = register.setdefault(signature, node)
+                if equivalent != node:
+                    children[path[i - 1]][word[i - 1]] = equivalent
+                    del children[node]
+                    final.discard(node)
+
+        previous = None  # type: Optional[str]
+        path = [0]
+
+        for word in words:
+            word = str(word)
+
+            if previous is not None:
+                if word < previous:
+                    raise ValueError(
+                        'words must be sorted: {!r} came after {!r}'.format(
+                            word, previous))
+
+                if word == previous:
+                    continue
+
+            depth = 0
+            if previous is not None:
+                limit = min(len(word), len(previous))
+                while depth < limit and word[depth] == previous[depth]:
+                    depth += 1
+
+                replace_or_register(path, previous, depth)
+                del path[depth + 1:]
+
+            for c in word[depth:]:
+                node = next(names)
+                children[node] = {}
+                children[path[-1]][c] = node
+                path.append(node)
+
+            final.add(path[-1])
+            previous = word
+
+        if previous is not None:
+            replace_or_register(path, previous, 0)
+
+        table = {
+            node: State('Q{}'.format(i))
+            for i, node in enumerate(sorted(children))
+        }
+        symbols = {}  # type: Dict[str, Symbol]
+
+        fa = cls({}, table[0], (table[node] for node in final))
+        fa.states = set(table.values())
+
+        for node, t in children.items():
+            if not t:
+                continue
+
+            row = fa._delta[table[node]] = {}
+            for c, child in t.items():
+                try:
+                    symbol = symbols[c]
+                except KeyError:
+                    symbol = symbols[c] = Symbol(c)
+
+                row[symbol] = {table[child]}
+
+        fa.alphabet = set(symbols.values())
+        fa.properties.update({
+            Property.DETERMINISTIC,
+            Property.EPSILON_FREE,
+            Property.TRIM,
+            Property.MINIMAL,
+        })
+        return fa
+
+    def union(self, other: 'FiniteAutomaton') -> 'FiniteAutomaton':
+        return FiniteAutomaton.union_all([self, other])
+
+    def concatenate(self, other: 'FiniteAutomaton') -> 'FiniteAutomaton':
+        return FiniteAutomaton.concatenate_all([self, other])
+
+    def lazy(self, name: Optional[str] = None):
+        from .lazy import LazyAutomaton
+        return LazyAutomaton('fa', fa=self, name=name)
 
     def is_deterministic(self):
+        if Property.DETERMINISTIC in self.properties:
+            return True
+
         for state in self.states:
             if len(self.transitate(state, Symbol('&'))) > 0:
                 return False
@@ -551,4 +1455,5 @@ class FiniteAutomaton:
                 if len(self.transitate(state, symbol)) > 1:
                     return False
 
+        self.properties.update({Property.DETERMINISTIC, Property.EPSILON_FREE})
         return True
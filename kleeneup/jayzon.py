@@ -1,9 +1,17 @@
 import json
+import re
+from types import GeneratorType
+from typing import Any, Container, Iterable, Iterator, TextIO, Tuple
 
 from kleeneup import Symbol
 
 load = json.load
 
+CHUNK_SIZE = 1 << 16
+
+WHITESPACE = re.compile(r'\s*')
+DECODER = json.JSONDecoder()
+
 
 def dump(obj, f):
     return json.dump(obj, f, default=default, indent=2, sort_keys=False)
@@ -17,3 +25,154 @@ def default(obj):
         return sorted(obj)
 
     raise TypeError
+
+
+def iterdump(pairs: Iterable[Tuple[str, Any]], f: TextIO, compact=False):
+    """Escreve um objeto JSON a partir de pares (chave, valor) sem montá-lo
+    em memória. Valores que são generators são escritos como listas, um
+    elemento por vez.
+
+    Parâmetros:
+    pairs   -- pares (chave, valor) do objeto
+    f       -- arquivo de saída
+    compact -- omite a indentação (padrão False)
+    """
+    if compact:
+        key_separator = ':'
+
+        def encode(obj, level):
+            return json.dumps(obj, default=default, separators=(',', ':'))
+
+        def newline(level):
+            # Keeps one array element per line.
+            return '\n' if level == 2 else ''
+    else:
+        key_separator = ': '
+
+        def encode(obj, level):
+            text = json.dumps(obj, default=default, indent=2)
+            return text.replace('\n', newline(level))
+
+        def newline(level):
+            return '\n' + '  ' * level
+
+    f.write('{')
+
+    for i, (key, value) in enumerate(pairs):
+        if i:
+            f.write(',')
+        f.write(newline(1) + json.dumps(key) + key_separator)
+
+        if not isinstance(value, GeneratorType):
+            f.write(encode(value, 1))
+            continue
+
+        f.write('[')
+
+        items = 0
+        for item in value:
+            if items:
+                f.write(',')
+            f.write(newline(2) + encode(item, 2))
+            items += 1
+
+        if items:
+            f.write(newline(1))
+        f.write(']')
+
+    f.write(newline(0) + '}\n')
+
+
+class _Reader:
+    def __init__(self, f: TextIO) -> None:
+        self.f = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        chunk = self.f.read(CHUNK_SIZE)
+
+        if not chunk:
+            self.eof = True
+            return False
+
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = WHITESPACE.match(self.buffer, self.pos).end()
+
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise json.JSONDecodeError(
+                'Expecting {!r}'.format(char), self.buffer, self.pos)
+
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+
+            # A number that ends with the buffer may continue in the next
+            # chunk.
+            if end < len(self.buffer) or not self.fill():
+                self.pos = end
+                return value
+
+
+def iterload(f: TextIO,
+             stream_keys: Container[str] = ()) -> Iterator[Tuple[str, Any]]:
+    """Retorna um generator dos pares (chave, valor) de um objeto JSON,
+    lendo o arquivo aos poucos. Os valores das chaves em stream_keys devem ser
+    listas, e cada elemento é gerado como um par (chave, elemento).
+
+    Parâmetros:
+    f           -- arquivo de entrada
+    stream_keys -- chaves cujas listas são lidas elemento a elemento
+    """
+    reader = _Reader(f)
+    reader.expect('{')
+
+    if reader.peek() == '}':
+        return
+
+    while True:
+        key = reader.value()
+        reader.expect(':')
+
+        if key in stream_keys:
+            reader.expect('[')
+
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield key, reader.value()
+
+                    if reader.peek() != ',':
+                        reader.expect(']')
+                        break
+                    reader.pos += 1
+        else:
+            yield key, reader.value()
+
+        if reader.peek() != ',':
+            reader.expect('}')
+            return
+        reader.pos += 1
@@ -0,0 +1,309 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from .finite_automaton import FiniteAutomaton, Property, Sentence, Symbol
+
+# Operations that take any number of operands and are associative, so that
+# nested applications can be flattened.
+N_ARY = {'union', 'concat', 'inter'}
+
+# The De Morgan dual of each boolean operation.
+DUALS = {'union': 'inter', 'inter': 'union'}
+
+
+class LazyAutomaton:
+    def __init__(self, operation: str,
+                 children: Iterable['LazyAutomaton'] = (),
+                 fa: Optional[FiniteAutomaton] = None,
+                 alphabet: Optional[Iterable[Symbol]] = None,
+                 name: Optional[str] = None) -> None:
+        """Retorna um nodo de uma expressão sobre autômatos finitos, que só
+        é construída quando o resultado é avaliado ou gravado.
+
+        Cada nodo guarda o seu alfabeto. O de uma negação é o alfabeto em
+        relação ao qual o complemento é feito, fixado quando o nodo é
+        criado, de modo que reescrever os operandos não muda a linguagem.
+
+        Parâmetros:
+        operation -- nome da operação, ou 'fa' para um autômato
+        children  -- operandos da operação (padrão vazio)
+        fa        -- o autômato de um nodo 'fa' (padrão None)
+        alphabet  -- símbolos a acrescentar ao alfabeto dos operandos, como
+                     em FiniteAutomaton.negate (padrão None)
+        name      -- nome de um nodo 'fa', usado em repr (padrão None)
+        """
+        self.operation = operation
+        self.children = tuple(children)
+        self.fa = fa
+        self.name = name
+
+        if operation == 'fa':
+            symbols = fa.alphabet  # type: Iterable[Symbol]
+        else:
+            symbols = set(alphabet or ()).union(
+                *(c.alphabet for c in self.children))
+        self.alphabet = frozenset(
+            s for s in symbols if s != Symbol('&'))  # type: FrozenSet[Symbol]
+
+        self._optimized = None  # type: Optional[LazyAutomaton]
+        self._results = {}  # type: Dict[int, FiniteAutomaton]
+
+    def __repr__(self) -> str:
+        if self.operation == 'fa':
+            return self.name or '<{} states>'.format(len(self.fa.states))
+
+        return '{}({})'.format(
+            self.operation, ', '.join(repr(c) for c in self.children))
+
+    def union(self, other) -> 'LazyAutomaton':
+        return LazyAutomaton('union', (self, lazy(other)))
+
+    def concatenate(self, other) -> 'LazyAutomaton':
+        return LazyAutomaton('concat', (self, lazy(other)))
+
+    def intersection(self, other) -> 'LazyAutomaton':
+        return LazyAutomaton('inter', (self, lazy(other)))
+
+    def difference(self, other) -> 'LazyAutomaton':
+        return LazyAutomaton('diff', (self, lazy(other)))
+
+    def negate(self, alphabet: Optional[Iterable[Symbol]] = None
+               ) -> 'LazyAutomaton':
+        return LazyAutomaton('neg', (self,), alphabet=alphabet)
+
+    def kleene_star(self) -> 'LazyAutomaton':
+        return LazyAutomaton('star', (self,))
+
+    def reverse(self) -> 'LazyAutomaton':
+        return LazyAutomaton('rev', (self,))
+
+    def optimize(self) -> 'LazyAutomaton':
+        """Retorna uma expressão equivalente reescrita: diferenças viram
+        interseções com a negação, negações duplas são removidas, negações
+        são empurradas para os operandos (De Morgan) quando isso cancela
+        outra negação, uniões, concatenações e interseções aninhadas viram
+        uma só operação n-ária, e subexpressões iguais são compartilhadas.
+        """
+        if self._optimized is None:
+            optimized = self._optimized = _optimize(self, {}, {})
+            optimized._optimized = optimized
+        return self._optimized
+
+    def materialize(self) -> FiniteAutomaton:
+        """Retorna o autômato finito da expressão otimizada, construindo
+        cada subexpressão compartilhada uma única vez. Interseções são
+        construídas como um único produto de todos os operandos.
+        """
+        root = self.optimize()
+        fa = root._build(root).copy()
+
+        # Rewriting never adds symbols, but it may drop some, as in
+        # neg(neg(a)) with a symbol that a does not use.
+        new_symbols = self.alphabet - fa.alphabet
+        if new_symbols:
+            if fa.sink_accepting:
+                fa.materialize_sink()
+            if not fa.implicit_sink:
+                fa.properties.discard(Property.COMPLETE)
+            fa.alphabet.update(new_symbols)
+
+        return fa
+
+    def evaluate(self, sentence: Sentence) -> bool:
+        """Retorna se a sentença é aceita, sem construir as uniões,
+        interseções, diferenças e negações: cada operando é avaliado
+        separadamente. Só as concatenações, fechos e reversos são
+        construídos, uma vez, e guardados para as próximas avaliações.
+
+        Parâmetros:
+        sentence -- a sentença
+        """
+        root = self.optimize()
+        symbols = list(sentence)
+        return root._match(root, Sentence(symbols), set(symbols), {})
+
+    def save(self, filename: str, binary: bool = False):
+        """Constrói o autômato da expressão e o grava em um arquivo.
+
+        Parâmetros:
+        filename -- caminho do arquivo
+        binary   -- grava no formato binário (padrão False)
+        """
+        from .util import fa_to_file
+        return fa_to_file(self.materialize(), filename, binary=binary)
+
+    def _build(self, node: 'LazyAutomaton') -> FiniteAutomaton:
+        # Results are kept by node identity; the nodes are kept alive by
+        # the optimized expression.
+        try:
+            return self._results[id(node)]
+        except KeyError:
+            pass
+
+        operation = node.operation
+
+        if operation == 'fa':
+            fa = node.fa
+        else:
+            operands = [self._build(c) for c in node.children]
+
+            if operation == 'union':
+                fa = FiniteAutomaton.union_all(operands)
+            elif operation == 'concat':
+                fa = FiniteAutomaton.concatenate_all(operands)
+            elif operation == 'inter':
+                fa = FiniteAutomaton.intersection_all(operands)
+            elif operation == 'diff':
+                fa = operands[0].difference(operands[1])
+            elif operation == 'neg':
+                fa = operands[0].negate(node.alphabet)
+            elif operation == 'star':
+                fa = operands[0].kleene_star()
+            else:
+                fa = operands[0].reverse()
+
+        self._results[id(node)] = fa
+        return fa
+
+    def _match(self, node: 'LazyAutomaton', sentence: Sentence,
+               symbols, matched: Dict[int, bool]) -> bool:
+        try:
+            return matched[id(node)]
+        except KeyError:
+            pass
+
+        operation = node.operation
+
+        def match(child):
+            return self._match(child, sentence, symbols, matched)
+
+        if operation == 'union':
+            result = any(match(c) for c in node.children)
+        elif operation == 'inter':
+            result = all(match(c) for c in node.children)
+        elif operation == 'diff':
+            result = match(node.children[0]) and not match(node.children[1])
+        elif operation == 'neg':
+            result = (symbols <= node.alphabet
+                      and not match(node.children[0]))
+        else:
+            result = self._build(node).evaluate(sentence)
+
+        matched[id(node)] = result
+        return result
+
+
+def lazy(fa: Union[FiniteAutomaton, LazyAutomaton],
+         name: Optional[str] = None) -> LazyAutomaton:
+    """Retorna uma expressão formada apenas pelo autômato.
+
+    Parâmetros:
+    fa   -- o autômato finito (ou uma expressão, retornada sem mudanças)
+    name -- nome do autômato, usado em repr (padrão None)
+    """
+    if isinstance(fa, LazyAutomaton):
+        return fa
+
+    return LazyAutomaton('fa', fa=fa, name=name)
+
+
+def _optimize(node: LazyAutomaton, done: Dict[int, LazyAutomaton],
+              table: Dict[Tuple, LazyAutomaton]) -> LazyAutomaton:
+    try:
+        return done[id(node)]
+    except KeyError:
+        pass
+
+    if node.operation == 'fa':
+        result = _node(table, 'fa', fa=node.fa, name=node.name)
+    else:
+        children = [_optimize(c, done, table) for c in node.children]
+        result = _rewrite(table, node, children)
+
+    done[id(node)] = result
+    return result
+
+
+def _rewrite(table, node: LazyAutomaton,
+             children: List[LazyAutomaton]) -> LazyAutomaton:
+    operation = node.operation
+
+    if operation == 'diff':
+        a, b = children
+        return _n_ary(table, 'inter', [a, _negation(table, b, node.alphabet)])
+
+    if operation == 'neg':
+        return _negation(table, children[0], node.alphabet)
+
+    if operation in N_ARY:
+        return _n_ary(table, operation, children)
+
+    child, = children
+
+    if operation == 'star' and child.operation == 'star':
+        return child
+
+    if operation == 'rev' and child.operation == 'rev':
+        return child.children[0]
+
+    return _node(table, operation, children)
+
+
+def _negation(table, child: LazyAutomaton,
+              alphabet: FrozenSet[Symbol]) -> LazyAutomaton:
+    # Complements over the same alphabet cancel out.
+    if child.operation == 'neg' and child.alphabet == alphabet:
+        return child.children[0]
+
+    # De Morgan, only when it cancels the negation of some operand:
+    # otherwise it would trade one negation for several.
+    if child.operation in DUALS and any(
+            c.operation == 'neg' and c.alphabet == alphabet
+            for c in child.children):
+        return _n_ary(table, DUALS[child.operation], [
+            _negation(table, c, alphabet) for c in child.children])
+
+    return _node(table, 'neg', [child], alphabet)
+
+
+def _n_ary(table, operation: str,
+           children: List[LazyAutomaton]) -> LazyAutomaton:
+    flat = []  # type: List[LazyAutomaton]
+    for child in children:
+        if child.operation == operation:
+            flat.extend(child.children)
+        else:
+            flat.append(child)
+
+    # Repeated operands of a union or an intersection change nothing.
+    if operation != 'concat':
+        unique = []  # type: List[LazyAutomaton]
+        for child in flat:
+            if all(child is not c for c in unique):
+                unique.append(child)
+        flat = unique
+
+    if len(flat) == 1:
+        return flat[0]
+
+    return _node(table, operation, flat)
+
+
+def _node(table, operation: str, children: Iterable[LazyAutomaton] = (),
+          alphabet: Optional[FrozenSet[Symbol]] = None,
+          fa: Optional[FiniteAutomaton] = None,
+          name: Optional[str] = None) -> LazyAutomaton:
+    # Equal subexpressions are shared through a table of the nodes already
+    # built, keyed by the identity of their operands, which are themselves
+    # shared.
+    if operation == 'fa':
+        key = ('fa', id(fa))  # type: Tuple
+    else:
+        key = (operation, alphabet if operation == 'neg' else None,
+               tuple(id(c) for c in children))
+
+    try:
+        return table[key]
+    except KeyError:
+        node = table[key] = LazyAutomaton(
+            operation, children, fa=fa, alphabet=alphabet, name=name)
+        return node
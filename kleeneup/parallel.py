@@ -0,0 +1,221 @@
+import multiprocessing
+import zlib
+from array import array
+from typing import Dict, List, Tuple
+
+from .finite_automaton import FiniteAutomaton
+from .stats import current as current_stats
+
+
+def determinize(fa: FiniteAutomaton, workers: int) -> FiniteAutomaton:
+    """Retorna o autômato finito determinístico equivalente, com a construção
+    de subconjuntos dividida entre processos.
+
+    Cada subconjunto pertence ao processo indicado por um hash dos seus
+    estados, que é o único a numerá-lo e a expandi-lo. A construção avança
+    em rodadas: cada processo expande os subconjuntos novos que possui e
+    envia os destinos encontrados, em lotes, aos seus donos, que descartam
+    os já conhecidos. Ao final, as tabelas de transições de todos os
+    processos são unidas.
+
+    Parâmetros:
+    fa      -- o autômato finito
+    workers -- número de processos
+    """
+    fa, initial, accepting, symbol_classes, moves = fa._numbered()
+
+    connections = []
+    processes = []
+    for _ in range(workers):
+        parent, child = multiprocessing.Pipe()
+        process = multiprocessing.Process(
+            target=_work, args=(child, moves, accepting, workers), daemon=True)
+        process.start()
+        child.close()
+        connections.append(parent)
+        processes.append(process)
+
+    record = current_stats()
+
+    try:
+        initial_key = _encode([initial])
+        first = _owner(initial_key, workers)
+
+        batches = [[[]] for _ in range(workers)]
+        batches[first] = [[initial_key]]
+        pending = sum(found for _, found in _call(
+            connections, [('own', batch) for batch in batches]))
+
+        while pending:
+            expanded = _call(connections, [('expand',)] * workers)
+
+            if record is not None:
+                for outbox, count, largest in expanded:
+                    record.subset_states += count
+                    record.largest_subset = max(
+                        record.largest_subset, largest)
+
+            # Targets found by worker w that belong to worker o are in
+            # expanded[w][0][o]; owners answer with their numbers, in the
+            # same order.
+            owned = _call(connections, [
+                ('own', [outbox[o] for outbox, _, _ in expanded])
+                for o in range(workers)
+            ])
+            pending = sum(found for _, found in owned)
+
+            _call(connections, [
+                ('resolve', [ids[w] for ids, _ in owned])
+                for w in range(workers)
+            ])
+
+        results = _call(connections, [('result',)] * workers)
+
+        _call(connections, [('stop',)] * workers)
+    finally:
+        for connection in connections:
+            connection.close()
+        for process in processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+    # Global numbers: the subsets of each worker follow those of the
+    # previous ones, starting with the owner of the initial subset so that
+    # the initial subset is number 0.
+    order = [first] + [w for w in range(workers) if w != first]
+    offsets = {}  # type: Dict[int, int]
+    size = 0
+    for w in order:
+        offsets[w] = size
+        size += results[w][0]
+
+    accept_ids = [
+        offsets[w] + i
+        for w, (_, accept, _) in enumerate(results)
+        for i in accept
+    ]
+    transitions = [
+        (offsets[w] + source, c, offsets[owner] + target)
+        for w, (_, _, table) in enumerate(results)
+        for source, c, owner, target in table
+    ]
+
+    return fa._from_subsets(symbol_classes, size, accept_ids, transitions)
+
+
+def _encode(members) -> bytes:
+    return array('I', sorted(members)).tobytes()
+
+
+def _owner(key: bytes, workers: int) -> int:
+    # Python's hash of bytes changes between processes, CRC-32 does not.
+    return zlib.crc32(key) % workers
+
+
+def _call(connections, messages):
+    for connection, message in zip(connections, messages):
+        connection.send(message)
+
+    replies = [connection.recv() for connection in connections]
+
+    for reply in replies:
+        if isinstance(reply, Exception):
+            raise reply
+
+    return replies
+
+
+def _work(connection, moves: List[List[List[int]]], accepting,
+          workers: int):
+    # Loop of a worker process: answers the messages sent by determinize()
+    # until it is told to stop.
+    ids = {}  # type: Dict[bytes, int]
+    subsets = []  # type: List[bytes]
+    accept = []  # type: List[int]
+    frontier = []  # type: List[int]
+
+    # Transitions as (source, symbol class, owner, target). While a round
+    # is running, target is the position of the target in the batch sent to
+    # its owner; after the owner answers, it is the owner's number.
+    table = []  # type: List[Tuple[int, int, int, int]]
+    unresolved = 0
+
+    while True:
+        message = connection.recv()
+        operation = message[0]
+
+        try:
+            if operation == 'own':
+                found = 0
+                answer = []
+
+                for batch in message[1]:
+                    numbers = []
+                    for key in batch:
+                        number = ids.get(key)
+                        if number is None:
+                            number = ids[key] = len(subsets)
+                            subsets.append(key)
+                            frontier.append(number)
+                            found += 1
+
+                            members = array('I')
+                            members.frombytes(key)
+                            if not accepting.isdisjoint(members):
+                                accept.append(number)
+
+                        numbers.append(number)
+                    answer.append(numbers)
+
+                connection.send((answer, found))
+
+            elif operation == 'expand':
+                outbox = [[] for _ in range(workers)]  # type: List[List[bytes]]
+                positions = [{} for _ in range(workers)]  # type: List[Dict[bytes, int]]
+                largest = 0
+                unresolved = len(table)
+
+                for source in frontier:
+                    members = array('I')
+                    members.frombytes(subsets[source])
+                    largest = max(largest, len(members))
+
+                    for c, class_moves in enumerate(moves):
+                        next_members = set()
+                        for i in members:
+                            next_members.update(class_moves[i])
+
+                        if not next_members:
+                            continue
+
+                        key = _encode(next_members)
+                        owner = _owner(key, workers)
+
+                        position = positions[owner].get(key)
+                        if position is None:
+                            position = positions[owner][key] = len(
+                                outbox[owner])
+                            outbox[owner].append(key)
+
+                        table.append((source, c, owner, position))
+
+                connection.send((outbox, len(frontier), largest))
+                frontier = []
+
+            elif operation == 'resolve':
+                numbers = message[1]
+                for i in range(unresolved, len(table)):
+                    source, c, owner, position = table[i]
+                    table[i] = (source, c, owner, numbers[owner][position])
+
+                connection.send(None)
+
+            elif operation == 'result':
+                connection.send((len(subsets), accept, table))
+
+            elif operation == 'stop':
+                connection.send(None)
+                return
+        except Exception as e:
+            connection.send(e)
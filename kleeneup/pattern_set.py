@@ -0,0 +1,145 @@
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from .finite_automaton import FiniteAutomaton, Sentence, State, Symbol
+from .regular_expression import RegularExpression
+
+Pattern = Union[RegularExpression, FiniteAutomaton]
+SetState = FrozenSet[Tuple[int, State]]
+
+
+class PatternSet:
+    def __init__(self, patterns: Iterable[Pattern] = ()) -> None:
+        """Retorna um conjunto de padrões avaliados em uma única varredura.
+
+        Os padrões são combinados em um autômato cujos estados são conjuntos
+        de pares (padrão, estado). A determinização é feita sob demanda: cada
+        transição é calculada na primeira vez em que é usada e memorizada.
+
+        Parâmetros:
+        patterns -- expressões regulares ou autômatos finitos (padrão vazio)
+        """
+        self._automata = []  # type: List[FiniteAutomaton]
+        self._initial_state = frozenset()  # type: SetState
+        self._delta = {}  # type: Dict[SetState, Dict[Symbol, SetState]]
+        self._tags = {}  # type: Dict[SetState, int]
+        self._classes = None  # type: Optional[Dict[Symbol, Symbol]]
+
+        for pattern in patterns:
+            self.add(pattern)
+
+    def __len__(self) -> int:
+        return len(self._automata)
+
+    def add(self, pattern: Pattern) -> int:
+        """Adiciona um padrão ao conjunto e retorna o seu identificador.
+
+        Parâmetros:
+        pattern -- expressão regular ou autômato finito
+        """
+        if isinstance(pattern, RegularExpression):
+            fa = pattern.to_finite_automaton()
+        else:
+            fa = pattern.copy()
+            fa.materialize_sink()
+        fa.remove_epsilon_transitions()
+
+        pattern_id = len(self._automata)
+        self._automata.append(fa)
+        self._initial_state = self._initial_state.union(
+            {(pattern_id, fa.initial_state)})
+
+        self._delta.clear()
+        self._tags.clear()
+        self._classes = None
+
+        return pattern_id
+
+    def _symbol_classes(self) -> Dict[Symbol, Symbol]:
+        signatures = {}  # type: Dict[Symbol, List[Tuple[int, int]]]
+
+        for pattern_id, fa in enumerate(self._automata):
+            for class_id, symbol_class in enumerate(fa.symbol_classes()):
+                for symbol in symbol_class:
+                    signatures.setdefault(symbol, []).append(
+                        (pattern_id, class_id))
+
+        classes = {}  # type: Dict[Tuple[Tuple[int, int], ...], Symbol]
+        representatives = {}  # type: Dict[Symbol, Symbol]
+        for symbol in sorted(signatures):
+            key = tuple(signatures[symbol])
+            representatives[symbol] = classes.setdefault(key, symbol)
+
+        return representatives
+
+    def _step(self, states: SetState, symbol: Symbol) -> SetState:
+        if self._classes is None:
+            self._classes = self._symbol_classes()
+
+        symbol = self._classes.get(symbol, symbol)
+        row = self._delta.setdefault(states, {})
+
+        try:
+            return row[symbol]
+        except KeyError:
+            pass
+
+        next_states = frozenset(
+            (pattern_id, next_state)
+            for pattern_id, state in states
+            for next_state in self._automata[pattern_id].transitate(
+                state, symbol)
+        )
+
+        row[symbol] = next_states
+        return next_states
+
+    def _tag(self, states: SetState) -> int:
+        try:
+            return self._tags[states]
+        except KeyError:
+            pass
+
+        bitset = 0
+        for pattern_id, state in states:
+            if state in self._automata[pattern_id].accept_states:
+                bitset |= 1 << pattern_id
+
+        self._tags[states] = bitset
+        return bitset
+
+    def match_bitset(self, sentence: Union[str, Sentence]) -> int:
+        """Retorna um inteiro cujo bit i indica se o padrão i aceita a
+        sentença.
+
+        Parâmetros:
+        sentence -- sentença a ser avaliada
+        """
+        if isinstance(sentence, str):
+            sentence = Sentence(sentence)
+
+        states = self._initial_state
+
+        for symbol in sentence:
+            states = self._step(states, symbol)
+
+            if not states:
+                return 0
+
+        return self._tag(states)
+
+    def matches(self, sentence: Union[str, Sentence]) -> List[int]:
+        """Retorna os identificadores dos padrões que aceitam a sentença, em
+        ordem crescente.
+
+        Parâmetros:
+        sentence -- sentença a ser avaliada
+        """
+        bitset = self.match_bitset(sentence)
+
+        pattern_ids = []
+        while bitset:
+            lowest = bitset & -bitset
+            pattern_ids.append(lowest.bit_length() - 1)
+            bitset ^= lowest
+
+        return pattern_ids
@@ -0,0 +1,270 @@
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from lark import Lark, Tree
+
+from .finite_automaton import FiniteAutomaton
+from .regular_expression import RegularExpression
+
+parser = Lark('''?expr: call
+                      | STRING -> regex
+                      | PATH -> file
+
+                 call: NAME "(" [expr ("," expr)*] ")"
+
+                 %import common.ESCAPED_STRING -> STRING
+                 %import common.WS
+                 %ignore WS
+
+                 NAME: /[a-z_]+/
+                 PATH: /[^\\s(),"]+/
+    ''', start='expr')
+
+# Operation name, accepted aliases and number of operands (None for any
+# number of operands).
+OPERATIONS = {
+    'union': (('or',), None),
+    'concat': (('concatenate', 'cat'), None),
+    'inter': (('intersection', 'and'), None),
+    'diff': (('difference',), 2),
+    'det': (('determinize',), 1),
+    'min': (('minimize',), 1),
+    'neg': (('negate', 'not'), 1),
+    'star': (('kleene_star',), 1),
+    'rev': (('reverse',), 1),
+}
+
+ALIASES = {
+    alias: name
+    for name, (aliases, _) in OPERATIONS.items()
+    for alias in aliases + (name,)
+}
+
+# Operations whose result is always deterministic.
+DETERMINISTIC = {'det', 'min', 'neg', 'inter', 'diff'}
+
+# Operations that are their own inverse up to the language accepted.
+INVOLUTIONS = {'neg', 'rev'}
+
+
+class PipelineError(Exception):
+    pass
+
+
+class Node:
+    def __init__(self, operation: str, children: Tuple['Node', ...] = (),
+                 value: Optional[str] = None) -> None:
+        """Retorna um nodo de um plano de execução.
+
+        Parâmetros:
+        operation -- nome da operação, 'file' ou 'regex'
+        children  -- operandos da operação (padrão vazio)
+        value     -- caminho do arquivo ou expressão regular (padrão None)
+        """
+        self.operation = operation
+        self.children = children
+        self.value = value
+
+    def __repr__(self) -> str:
+        if self.operation == 'file':
+            return self.value
+
+        if self.operation == 'regex':
+            return '"{}"'.format(self.value)
+
+        return '{}({})'.format(
+            self.operation, ', '.join(repr(c) for c in self.children))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Node) and repr(self) == repr(other)
+
+    def __hash__(self) -> int:
+        return hash(repr(self))
+
+    @property
+    def deterministic(self) -> bool:
+        return self.operation in DETERMINISTIC
+
+
+def parse(expression: str) -> Node:
+    """Retorna a árvore de operações descrita por uma expressão como
+    min(det(union(a.fa, b.fa))).
+
+    Parâmetros:
+    expression -- a expressão
+    """
+    try:
+        tree = parser.parse(expression)
+    except Exception as e:
+        raise PipelineError('invalid expression: {}'.format(e)) from e
+
+    return _from_lark_tree(tree)
+
+
+def _from_lark_tree(l_tree) -> Node:
+    if l_tree.data == 'file':
+        return Node('file', value=l_tree.children[0].value)
+
+    if l_tree.data == 'regex':
+        return Node('regex', value=l_tree.children[0].value[1:-1])
+
+    name, *children = l_tree.children
+    children = [c for c in children if isinstance(c, Tree)]
+
+    try:
+        operation = ALIASES[name.value]
+    except KeyError:
+        raise PipelineError('unknown operation {}'.format(name.value))
+
+    arity = OPERATIONS[operation][1]
+    if not children or (arity is not None and len(children) != arity):
+        raise PipelineError('{} takes {} operand(s), got {}'.format(
+            operation, arity or 'one or more', len(children)))
+
+    return Node(operation, tuple(_from_lark_tree(c) for c in children))
+
+
+def plan(node: Node) -> Node:
+    """Retorna uma árvore equivalente sem passos desnecessários: operações
+    n-árias aninhadas são achatadas, determinizações de autômatos já
+    determinísticos e operações repetidas são removidas, e a minimização
+    recebe uma determinização quando necessário.
+
+    Parâmetros:
+    node -- raiz da árvore de operações
+    """
+    if node.operation in ('file', 'regex'):
+        return node
+
+    children = tuple(plan(c) for c in node.children)
+    operation = node.operation
+
+    if OPERATIONS[operation][1] is None:
+        flat = []  # type: List[Node]
+        for child in children:
+            if child.operation == operation:
+                flat.extend(child.children)
+            else:
+                flat.append(child)
+
+        if len(flat) == 1:
+            return flat[0]
+
+        return Node(operation, tuple(flat))
+
+    child = children[0]
+
+    if operation == 'det' and child.deterministic:
+        return child
+
+    if operation == 'min':
+        if child.operation == 'min':
+            return child
+
+        if not child.deterministic:
+            child = Node('det', (child,))
+
+        return Node('min', (child,))
+
+    if operation in INVOLUTIONS and child.operation == operation:
+        return child.children[0]
+
+    if operation == 'star' and child.operation == 'star':
+        return child
+
+    return Node(operation, children)
+
+
+class Pipeline:
+    def __init__(self, expression: str) -> None:
+        """Retorna uma sequência de operações sobre autômatos finitos,
+        executada em um único processo.
+
+        Parâmetros:
+        expression -- expressão como min(det(union(a.fa, b.fa)))
+        """
+        self.expression = expression
+        self.plan = plan(parse(expression))
+
+    def files(self) -> Set[str]:
+        """Retorna os arquivos usados pelo plano."""
+        files = set()  # type: Set[str]
+        pending = [self.plan]
+
+        while pending:
+            node = pending.pop()
+
+            if node.operation == 'file':
+                files.add(node.value)
+
+            pending.extend(node.children)
+
+        return files
+
+    def run(self, loader: Optional[Callable[[str], FiniteAutomaton]] = None
+            ) -> FiniteAutomaton:
+        """Executa o plano e retorna o autômato resultante. Subexpressões
+        repetidas, como um mesmo arquivo usado duas vezes, são avaliadas uma
+        única vez.
+
+        Parâmetros:
+        loader -- função que lê um autômato de um arquivo (padrão
+                  fa_from_file)
+        """
+        if loader is None:
+            from .util import fa_from_file
+            loader = fa_from_file
+
+        results = {}  # type: Dict[Node, FiniteAutomaton]
+        return self._evaluate(self.plan, loader, results)
+
+    def _evaluate(self, node: Node, loader, results) -> FiniteAutomaton:
+        try:
+            return results[node]
+        except KeyError:
+            pass
+
+        if node.operation == 'file':
+            fa = loader(node.value)
+        elif node.operation == 'regex':
+            fa = RegularExpression(node.value).to_finite_automaton()
+        else:
+            operands = [
+                self._evaluate(c, loader, results) for c in node.children]
+            fa = _apply(node.operation, operands)
+
+        results[node] = fa
+        return fa
+
+
+def _apply(operation: str, operands: List[FiniteAutomaton]) -> FiniteAutomaton:
+    if operation == 'union':
+        return FiniteAutomaton.union_all(operands)
+
+    if operation == 'concat':
+        return FiniteAutomaton.concatenate_all(operands)
+
+    if operation == 'inter':
+        return FiniteAutomaton.intersection_all(operands)
+
+    if operation == 'diff':
+        return operands[0].difference(operands[1])
+
+    fa, = operands
+
+    if operation == 'det':
+        # Intermediate results are never modified, so a deterministic one
+        # can be passed along without a copy.
+        if fa.is_deterministic():
+            return fa
+        return fa.determinize()
+
+    if operation == 'min':
+        return fa.minimize()
+
+    if operation == 'neg':
+        return fa.negate()
+
+    if operation == 'star':
+        return fa.kleene_star()
+
+    return fa.reverse()
@@ -2,7 +2,8 @@ from enum import Enum, unique
 
 from lark import Lark, Tree
 
-from .finite_automaton import FiniteAutomaton, State, Symbol
+from .finite_automaton import FiniteAutomaton, Property, State, Symbol
+from .stats import instrumented
 
 parser = Lark('''?e: e "|" a -> union
                    | a
@@ -282,6 +283,7 @@ class RegularExpression:
         """
         self.expression = string
 
+    @instrumented
     def to_finite_automaton(self):
         """Retorna um autômato finito a partir de uma expressão regular."""
         d_tree = parser.parse(self.expression)
@@ -343,4 +345,10 @@ class RegularExpression:
                         transitions[(compositions[current_comp], s)
                         ] = {compositions[new_comp]}
 
-        return FiniteAutomaton(transitions, initial_state, accept_states)
+        fa = FiniteAutomaton(transitions, initial_state, accept_states)
+
+        if Symbol('&') not in symbols:
+            fa.properties.update(
+                {Property.DETERMINISTIC, Property.EPSILON_FREE})
+
+        return fa
@@ -0,0 +1,310 @@
+import asyncio
+import json
+import os
+import signal
+import stat
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Dict, List, Mapping, Optional, Set
+
+from .finite_automaton import FiniteAutomaton, Sentence
+from .pipeline import Pipeline, PipelineError
+from .regular_expression import RegularExpression
+
+# Maximum length of a request line.
+LINE_LIMIT = 64 * 1024 * 1024
+
+# Pipelines whose automata kept in memory have more states than this, in
+# total, run in a thread of the server instead of a worker process, so that
+# they are not copied to the worker on every request.
+RUN_IN_SERVER_STATES = 10000
+
+
+class RequestError(Exception):
+    pass
+
+
+def _compile(regex: str) -> FiniteAutomaton:
+    return RegularExpression(regex).to_finite_automaton()
+
+
+def _load(path: str) -> FiniteAutomaton:
+    from .util import fa_from_file
+    return fa_from_file(path)
+
+
+def _save(fa: FiniteAutomaton, path: str, binary: bool) -> str:
+    from .util import fa_to_file
+    return str(fa_to_file(fa, path, binary=binary))
+
+
+def _run(expression: str,
+         automata: Mapping[str, FiniteAutomaton]) -> FiniteAutomaton:
+    def loader(name):
+        try:
+            return automata[name]
+        except KeyError:
+            return _load(name)
+
+    return Pipeline(expression).run(loader)
+
+
+def _evaluate_batch(fa: FiniteAutomaton, sentences: List[str]) -> List[bool]:
+    return [fa.evaluate(Sentence(sentence)) for sentence in sentences]
+
+
+class Server:
+    def __init__(self, path: str, workers: Optional[int] = None) -> None:
+        """Retorna um servidor que mantém autômatos finitos em memória e
+        responde a requisições em uma socket Unix.
+
+        Cada linha recebida é um objeto JSON com o campo "op" e, opcionalmente,
+        um "id" que é repetido na resposta. Requisições da mesma conexão são
+        atendidas concorrentemente, então as respostas podem chegar fora de
+        ordem. Operações custosas são executadas em processos separados.
+
+        Parâmetros:
+        path    -- caminho da socket
+        workers -- número de processos para operações custosas (padrão:
+                   número de CPUs)
+        """
+        self.path = path
+        self.workers = workers
+        self.automata = {}  # type: Dict[str, FiniteAutomaton]
+
+        self._socket = None  # type: Optional[os.stat_result]
+        self._executor = None  # type: Optional[ProcessPoolExecutor]
+        self._server = None  # type: Optional[asyncio.AbstractServer]
+        self._connections = set()  # type: Set[asyncio.Future]
+        self._handlers = {
+            'load': self.load,
+            'compile': self.compile,
+            'evaluate': self.evaluate,
+            'evaluate_batch': self.evaluate_batch,
+            'run': self.run,
+            'save': self.save,
+            'list': self.list,
+            'unload': self.unload,
+        }
+
+    async def start(self):
+        # Only a socket left behind by a previous server is replaced; any
+        # other file at the path is kept.
+        try:
+            mode = os.lstat(self.path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise FileExistsError(
+                    '{} exists and is not a socket'.format(self.path))
+            os.unlink(self.path)
+
+        self._executor = ProcessPoolExecutor(self.workers)
+        self._server = await asyncio.start_unix_server(
+            self._connect, self.path, limit=LINE_LIMIT)
+        self._socket = os.lstat(self.path)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        for connection in self._connections:
+            connection.cancel()
+
+        if self._connections:
+            await asyncio.wait(self._connections)
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+        if self._socket is not None:
+            self._remove_socket()
+            self._socket = None
+
+    def _remove_socket(self):
+        # The path may have been replaced since start(); only the socket
+        # created there is removed.
+        try:
+            current = os.lstat(self.path)
+        except FileNotFoundError:
+            return
+
+        if (stat.S_ISSOCK(current.st_mode)
+                and current.st_dev == self._socket.st_dev
+                and current.st_ino == self._socket.st_ino):
+            os.unlink(self.path)
+
+    def serve_forever(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.add_signal_handler(signal.SIGTERM, loop.stop)
+
+        try:
+            loop.run_until_complete(self.start())
+            loop.run_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            loop.run_until_complete(self.close())
+            loop.close()
+
+    async def _in_worker(self, function, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(function, *args))
+
+    def _connect(self, reader, writer):
+        connection = asyncio.ensure_future(
+            self._handle_connection(reader, writer))
+        self._connections.add(connection)
+        connection.add_done_callback(self._connections.discard)
+
+    async def _handle_connection(self, reader, writer):
+        lock = asyncio.Lock()
+        tasks = set()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+
+                if not line.strip():
+                    continue
+
+                task = asyncio.ensure_future(
+                    self._respond(line, writer, lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.wait(tasks)
+        finally:
+            writer.close()
+
+    async def _respond(self, line: bytes, writer, lock):
+        request_id = None
+
+        try:
+            request = json.loads(line.decode('utf-8'))
+            if not isinstance(request, dict):
+                raise RequestError('request must be an object')
+
+            request_id = request.get('id')
+
+            try:
+                handler = self._handlers[request['op']]
+            except KeyError:
+                raise RequestError('unknown op {!r}'.format(request.get('op')))
+
+            response = {'ok': True, 'result': await handler(request)}
+        except Exception as e:
+            response = {'ok': False, 'error': '{}: {}'.format(
+                type(e).__name__, e)}
+
+        if request_id is not None:
+            response['id'] = request_id
+
+        async with lock:
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            await writer.drain()
+
+    def _get(self, request: Mapping[str, Any]) -> FiniteAutomaton:
+        name = _field(request, 'name')
+
+        try:
+            return self.automata[name]
+        except KeyError:
+            raise RequestError('no automaton named {!r}'.format(name))
+
+    def _summary(self, name: str) -> Dict[str, Any]:
+        fa = self.automata[name]
+        return {
+            'name': name,
+            'states': len(fa.states),
+            'symbols': ''.join(sorted(str(s) for s in fa.alphabet)),
+            'deterministic': fa.is_deterministic(),
+        }
+
+    async def load(self, request):
+        name = _field(request, 'name')
+        fa = await self._in_worker(_load, _field(request, 'path'))
+        self.automata[name] = fa
+        return self._summary(name)
+
+    async def compile(self, request):
+        name = _field(request, 'name')
+        fa = await self._in_worker(_compile, _field(request, 'regex'))
+        self.automata[name] = fa
+        return self._summary(name)
+
+    async def evaluate(self, request):
+        fa = self._get(request)
+        return fa.evaluate(Sentence(_field(request, 'sentence')))
+
+    async def evaluate_batch(self, request):
+        fa = self._get(request)
+        sentences = _field(request, 'sentences')
+
+        # Runs in a thread so that other requests are not blocked while a
+        # large batch is evaluated.
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, _evaluate_batch, fa, sentences)
+
+    async def run(self, request):
+        expression = _field(request, 'expression')
+
+        try:
+            files = Pipeline(expression).files()
+        except PipelineError as e:
+            raise RequestError(str(e))
+
+        automata = {
+            name: self.automata[name]
+            for name in files
+            if name in self.automata
+        }
+
+        states = sum(len(fa.states) for fa in automata.values())
+        if states > RUN_IN_SERVER_STATES:
+            loop = asyncio.get_event_loop()
+            fa = await loop.run_in_executor(None, _run, expression, automata)
+        else:
+            fa = await self._in_worker(_run, expression, automata)
+
+        name = request.get('into')
+        if name is None:
+            return {
+                'states': len(fa.states),
+                'deterministic': fa.is_deterministic(),
+            }
+
+        self.automata[name] = fa
+        return self._summary(name)
+
+    async def save(self, request):
+        fa = self._get(request)
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            None, _save, fa, _field(request, 'path'),
+            bool(request.get('binary')))
+
+    async def list(self, request):
+        return [self._summary(name) for name in sorted(self.automata)]
+
+    async def unload(self, request):
+        self._get(request)
+        del self.automata[request['name']]
+        return None
+
+
+def _field(request: Mapping[str, Any], key: str) -> Any:
+    try:
+        return request[key]
+    except KeyError:
+        raise RequestError('missing field {!r}'.format(key))
@@ -0,0 +1,268 @@
+from typing import Dict, Iterable, Iterator, Set, Tuple
+
+from .finite_automaton import FiniteAutomaton, Property, State, Symbol
+
+Delta = Dict[State, Dict[Symbol, Set[State]]]
+
+
+def simulation(delta: Delta, states: Iterable[State],
+               marked: Iterable[State]) -> Dict[State, Set[State]]:
+    """Retorna a maior relação de simulação entre os estados de um autômato
+    sem transições por epsilon, como um dicionário que associa cada estado p
+    ao conjunto dos estados que simulam p.
+
+    Um estado q simula p quando q está em marked sempre que p está, e cada
+    transição de p por um símbolo pode ser imitada por uma transição de q
+    pelo mesmo símbolo que leva a um estado que simula o destino de p. Com
+    os estados de aceitação em marked, é a simulação direta; com as
+    transições invertidas e o estado inicial em marked, é a simulação
+    reversa.
+
+    Parâmetros:
+    delta  -- as transições, como em FiniteAutomaton._delta
+    states -- todos os estados
+    marked -- estados que só podem ser simulados por estados marcados
+    """
+    order = sorted(states)
+    index = {state: i for i, state in enumerate(order)}
+    symbols = sorted({symbol for t in delta.values() for symbol in t})
+    n = len(order)
+
+    # Sets of states are bitsets over their index. post[a][i] and pre[a][i]
+    # are the successors and predecessors of state i by the a-th symbol, and
+    # has[a] the states with some transition by it.
+    post = [[0] * n for _ in symbols]
+    pre = [[0] * n for _ in symbols]
+    has = [0] * len(symbols)
+
+    for a, symbol in enumerate(symbols):
+        for state, t in delta.items():
+            i = index[state]
+            for next_state in t.get(symbol, ()):
+                j = index[next_state]
+                post[a][i] |= 1 << j
+                pre[a][j] |= 1 << i
+                has[a] |= 1 << i
+
+    marked_bits = 0
+    for state in marked:
+        if state in index:
+            marked_bits |= 1 << index[state]
+
+    sim = []
+    for i in range(n):
+        row = (1 << n) - 1
+        if marked_bits >> i & 1:
+            row &= marked_bits
+        for a in range(len(symbols)):
+            if post[a][i]:
+                row &= has[a]
+        sim.append(row)
+
+    # A state p can only be simulated by states that reach, by each symbol,
+    # a state simulating each successor of p. Whenever the states
+    # simulating some target shrink, the predecessors of the target are
+    # restricted again.
+    pending = list(range(n))
+    queued = [True] * n
+
+    while pending:
+        target = pending.pop()
+        queued[target] = False
+
+        for a in range(len(symbols)):
+            sources = pre[a][target]
+            if not sources:
+                continue
+
+            simulating = sim[target]
+            if _count(simulating) <= _count(has[a]):
+                image = 0
+                for j in _bits(simulating):
+                    image |= pre[a][j]
+            else:
+                image = 0
+                for q in _bits(has[a]):
+                    if post[a][q] & simulating:
+                        image |= 1 << q
+
+            for p in _bits(sources):
+                row = sim[p] & image
+                if row != sim[p]:
+                    sim[p] = row
+                    if not queued[p]:
+                        queued[p] = True
+                        pending.append(p)
+
+    return {
+        order[i]: {order[j] for j in _bits(row)}
+        for i, row in enumerate(sim)
+    }
+
+
+def _bits(bitset: int) -> Iterator[int]:
+    while bitset:
+        low = bitset & -bitset
+        yield low.bit_length() - 1
+        bitset ^= low
+
+
+def _count(bitset: int) -> int:
+    return bin(bitset).count('1')
+
+
+def reduce(fa: FiniteAutomaton) -> FiniteAutomaton:
+    """Retorna um autômato finito sem transições por epsilon que reconhece a
+    mesma linguagem, reduzido com as simulações direta e reversa: estados
+    que se simulam mutuamente são unidos e transições dominadas por outras
+    são removidas.
+
+    O resultado costuma ser bem menor para autômatos produzidos por união,
+    concatenação e fecho, que replicam transições, e torna a determinização
+    mais barata. Não é necessariamente determinístico nem mínimo.
+
+    Parâmetros:
+    fa -- o autômato finito
+    """
+    if fa.implicit_sink or Property.EPSILON_FREE not in fa.properties:
+        fa = fa.copy()
+        fa._resolve_sink()
+        fa.remove_epsilon_transitions()
+
+    epsilon = Symbol('&')
+    initial_state = fa.initial_state
+    delta = {
+        state: {
+            symbol: set(next_states)
+            for symbol, next_states in t.items()
+            if symbol != epsilon and next_states
+        }
+        for state, t in fa._delta.items()
+    }  # type: Delta
+    accept_states = set(fa.accept_states)
+
+    delta, states = _trim(delta, initial_state, accept_states)
+    accept_states &= states
+    size = None
+
+    # Each pass may enable the next one, so they are repeated while the
+    # automaton keeps shrinking.
+    while size != _size(delta, states):
+        size = _size(delta, states)
+
+        sim = simulation(delta, states, accept_states)
+        delta, rep = _quotient(delta, states, sim, initial_state)
+        states = set(rep.values())
+        accept_states = {rep[state] for state in accept_states}
+        delta = _prune(delta, sim)
+        delta, states = _trim(delta, initial_state, accept_states)
+        accept_states &= states
+
+        inverse = _inverse(delta)
+        sim = simulation(inverse, states, {initial_state})
+        inverse, rep = _quotient(inverse, states, sim, initial_state)
+        states = set(rep.values())
+        accept_states = {rep[state] for state in accept_states}
+        delta = _inverse(_prune(inverse, sim))
+        delta, states = _trim(delta, initial_state, accept_states)
+        accept_states &= states
+
+    reduced = FiniteAutomaton({}, initial_state, accept_states)
+    reduced._delta = {state: t for state, t in delta.items() if t}
+    reduced.states = states
+    reduced.alphabet = {
+        symbol for symbol in fa.alphabet if symbol != epsilon}
+    reduced.properties.add(Property.EPSILON_FREE)
+    return reduced
+
+
+def _inverse(delta: Delta) -> Delta:
+    inverse = {}  # type: Delta
+    for state, t in delta.items():
+        for symbol, next_states in t.items():
+            for next_state in next_states:
+                inverse.setdefault(next_state, {}).setdefault(
+                    symbol, set()).add(state)
+    return inverse
+
+
+def _size(delta: Delta, states: Set[State]) -> Tuple[int, int]:
+    return len(states), sum(
+        len(next_states) for t in delta.values() for next_states in t.values())
+
+
+def _quotient(delta: Delta, states: Set[State], sim: Dict[State, Set[State]],
+              keep: State) -> Tuple[Delta, Dict[State, State]]:
+    # Merges states that simulate each other into one of them, keep if it
+    # is in the class, the smallest one otherwise.
+    rep = {}  # type: Dict[State, State]
+    for state in [keep] + sorted(states - {keep}):
+        if state not in rep:
+            for other in sim[state]:
+                if state in sim[other]:
+                    rep[other] = state
+
+    quotient = {}  # type: Delta
+    for state, t in delta.items():
+        new_t = quotient.setdefault(rep[state], {})
+        for symbol, next_states in t.items():
+            new_t.setdefault(symbol, set()).update(
+                rep[next_state] for next_state in next_states)
+
+    return quotient, rep
+
+
+def _prune(delta: Delta, sim: Dict[State, Set[State]]) -> Delta:
+    # Drops the transitions to a state strictly simulated by another target
+    # of the same state and symbol: any run through it can go through the
+    # other one instead.
+    pruned = {}  # type: Delta
+    for state, t in delta.items():
+        pruned[state] = {}
+
+        for symbol, next_states in t.items():
+            pruned[state][symbol] = {
+                q for q in next_states
+                if not any(other != q and other in sim[q] and
+                           q not in sim[other] for other in next_states)
+            }
+
+    return pruned
+
+
+def _trim(delta: Delta, initial_state: State,
+          accept_states: Set[State]) -> Tuple[Delta, Set[State]]:
+    # Keeps the states that are reachable and lead to acceptance, plus the
+    # initial state.
+    reachable = {initial_state}
+    pending = [initial_state]
+    while pending:
+        state = pending.pop()
+        for next_states in delta.get(state, {}).values():
+            for next_state in next_states - reachable:
+                reachable.add(next_state)
+                pending.append(next_state)
+
+    inverse = _inverse(delta)
+    useful = accept_states & reachable
+    pending = list(useful)
+    while pending:
+        state = pending.pop()
+        for sources in inverse.get(state, {}).values():
+            for source in (sources & reachable) - useful:
+                useful.add(source)
+                pending.append(source)
+
+    useful.add(initial_state)
+
+    trimmed = {}  # type: Delta
+    for state in useful:
+        t = {}
+        for symbol, next_states in delta.get(state, {}).items():
+            next_states = next_states & useful
+            if next_states:
+                t[symbol] = next_states
+        if t:
+            trimmed[state] = t
+
+    return trimmed, useful
@@ -0,0 +1,253 @@
+import os
+import sqlite3
+import tempfile
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .cache import fingerprint
+from .finite_automaton import FiniteAutomaton
+from .stats import current as current_stats
+
+# Rough number of bytes kept in memory for each subset, besides 4 bytes per
+# member, and for each transition.
+SUBSET_BYTES = 160
+TRANSITION_BYTES = 120
+
+# Number of subsets expanded between two commits of a checkpoint.
+CHECKPOINT_INTERVAL = 1000
+
+
+class CheckpointMismatch(Exception):
+    pass
+
+
+class _MemoryStore:
+    # Subsets are numbered in the order they are found, so the ones not
+    # expanded yet are exactly those numbered from cursor on.
+    def __init__(self) -> None:
+        self.ids = {}  # type: Dict[bytes, int]
+        self.subsets = []  # type: List[bytes]
+        self.accepting = []  # type: List[bool]
+        self.transitions = []  # type: List[Tuple[int, int, int]]
+        self.cursor = 0
+        self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.subsets)
+
+    def add(self, members: bytes, accepting: bool) -> int:
+        try:
+            return self.ids[members]
+        except KeyError:
+            pass
+
+        subset_id = self.ids[members] = len(self.subsets)
+        self.subsets.append(members)
+        self.accepting.append(accepting)
+        self.bytes += SUBSET_BYTES + len(members)
+        return subset_id
+
+    def members(self, subset_id: int) -> bytes:
+        return self.subsets[subset_id]
+
+    def add_transition(self, source: int, symbol_class: int, target: int):
+        self.transitions.append((source, symbol_class, target))
+        self.bytes += TRANSITION_BYTES
+
+    def advance(self):
+        self.cursor += 1
+
+    def accept_ids(self) -> Iterator[int]:
+        return (i for i, accepting in enumerate(self.accepting) if accepting)
+
+    def all_transitions(self) -> Iterator[Tuple[int, int, int]]:
+        return iter(self.transitions)
+
+    def close(self):
+        pass
+
+
+class _DiskStore:
+    def __init__(self, path: str, key: str, temporary: bool = False) -> None:
+        self.path = path
+        self.temporary = temporary
+        self.db = sqlite3.connect(path)
+        self.db.execute('PRAGMA journal_mode = WAL')
+        self.db.execute('PRAGMA synchronous = NORMAL')
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS subsets (
+                id INTEGER PRIMARY KEY,
+                members BLOB NOT NULL UNIQUE,
+                accepting INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS transitions (
+                source INTEGER NOT NULL,
+                class INTEGER NOT NULL,
+                target INTEGER NOT NULL,
+                PRIMARY KEY (source, class)
+            );
+        ''')
+
+        meta = dict(self.db.execute('SELECT key, value FROM meta'))
+        if meta.get('automaton', key) != key:
+            self.db.close()
+            raise CheckpointMismatch(
+                '{} is a checkpoint of another automaton'.format(path))
+
+        self.db.execute(
+            'INSERT OR IGNORE INTO meta VALUES (?, ?)', ('automaton', key))
+        self.cursor = int(meta.get('cursor', 0))
+        self._count = self.db.execute(
+            'SELECT COUNT(*) FROM subsets').fetchone()[0]
+        self._since_commit = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, members: bytes, accepting: bool) -> int:
+        row = self.db.execute(
+            'SELECT id FROM subsets WHERE members = ?', (members,)).fetchone()
+        if row is not None:
+            return row[0]
+
+        subset_id = self._count
+        self.db.execute('INSERT INTO subsets VALUES (?, ?, ?)',
+                        (subset_id, members, int(accepting)))
+        self._count += 1
+        return subset_id
+
+    def members(self, subset_id: int) -> bytes:
+        return self.db.execute(
+            'SELECT members FROM subsets WHERE id = ?',
+            (subset_id,)).fetchone()[0]
+
+    def add_transition(self, source: int, symbol_class: int, target: int):
+        self.db.execute('INSERT OR REPLACE INTO transitions VALUES (?, ?, ?)',
+                        (source, symbol_class, target))
+
+    def advance(self):
+        self.cursor += 1
+        self._since_commit += 1
+
+        if self._since_commit >= CHECKPOINT_INTERVAL:
+            self.commit()
+
+    def commit(self):
+        # The cursor is committed with the rows of the subsets expanded
+        # before it, so a resumed run starts from a consistent state.
+        self.db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)',
+                        ('cursor', str(self.cursor)))
+        self.db.commit()
+        self._since_commit = 0
+
+    def absorb(self, store: _MemoryStore):
+        self.db.executemany(
+            'INSERT INTO subsets VALUES (?, ?, ?)',
+            ((i, members, int(accepting)) for i, (members, accepting)
+             in enumerate(zip(store.subsets, store.accepting))))
+        self.db.executemany(
+            'INSERT INTO transitions VALUES (?, ?, ?)', store.transitions)
+        self._count = len(store)
+        self.cursor = store.cursor
+        self.commit()
+
+    def accept_ids(self) -> Iterator[int]:
+        return (row[0] for row in self.db.execute(
+            'SELECT id FROM subsets WHERE accepting ORDER BY id'))
+
+    def all_transitions(self) -> Iterator[Tuple[int, int, int]]:
+        return iter(self.db.execute(
+            'SELECT source, class, target FROM transitions'))
+
+    def close(self):
+        self.db.close()
+
+        if self.temporary:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(self.path + suffix):
+                    os.unlink(self.path + suffix)
+
+
+def determinize(fa: FiniteAutomaton, memory_limit: Optional[int] = None,
+                checkpoint: Optional[str] = None) -> FiniteAutomaton:
+    """Retorna o autômato finito determinístico equivalente, construído com
+    os subconjuntos e as transições fora da memória quando necessário.
+
+    Enquanto a estimativa de memória usada estiver abaixo de memory_limit,
+    tudo é mantido em memória; depois disso, os dados vão para um banco
+    SQLite temporário. Com checkpoint, o banco é esse arquivo desde o início
+    e o progresso é salvo periodicamente: se a execução for interrompida,
+    chamar a função de novo com o mesmo arquivo continua de onde parou. O
+    arquivo não é removido ao final.
+
+    Parâmetros:
+    fa           -- o autômato finito
+    memory_limit -- número aproximado de bytes em memória antes de usar o
+                    disco (padrão None, sem limite)
+    checkpoint   -- caminho do arquivo SQLite de checkpoint (padrão None)
+    """
+    fa, initial, accepting, symbol_classes, moves = fa._numbered()
+
+    def encode(members):
+        return array('I', sorted(members)).tobytes()
+
+    def decode(members):
+        a = array('I')
+        a.frombytes(members)
+        return a
+
+    key = fingerprint(fa)
+
+    if checkpoint is not None:
+        store = _DiskStore(checkpoint, key)
+    else:
+        store = _MemoryStore()
+
+    record = current_stats()
+
+    try:
+        if not len(store):
+            store.add(encode([initial]), initial in accepting)
+
+        while store.cursor < len(store):
+            source = store.cursor
+            members = decode(store.members(source))
+
+            if record is not None:
+                record.subset(len(members))
+
+            for c, class_moves in enumerate(moves):
+                next_members = set()
+                for i in members:
+                    next_members.update(class_moves[i])
+
+                if not next_members:
+                    continue
+
+                target = store.add(encode(next_members),
+                                   not accepting.isdisjoint(next_members))
+                store.add_transition(source, c, target)
+
+            store.advance()
+
+            if (memory_limit is not None and
+                    isinstance(store, _MemoryStore) and
+                    store.bytes > memory_limit):
+                descriptor, path = tempfile.mkstemp(suffix='.sqlite')
+                os.close(descriptor)
+                spilled = _DiskStore(path, key, temporary=True)
+                spilled.absorb(store)
+                store = spilled
+
+        if isinstance(store, _DiskStore):
+            store.commit()
+
+        return fa._from_subsets(symbol_classes, len(store),
+                                store.accept_ids(), store.all_transitions())
+    finally:
+        store.close()
+
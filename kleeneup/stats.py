@@ -0,0 +1,168 @@
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+# Counters reported by the operations. Counts add up from nested operations
+# into the ones that called them; largest_subset keeps the maximum.
+COUNTERS = ('subset_states', 'refinement_rounds', 'transitions_added')
+
+
+class OperationStats:
+    def __init__(self, operation: str, depth: int = 0) -> None:
+        """Retorna as estatísticas de uma execução de uma operação.
+
+        Parâmetros:
+        operation -- nome da operação
+        depth     -- número de operações em andamento que a chamaram
+                     (padrão 0)
+        """
+        self.operation = operation
+        self.depth = depth
+        self.started_at = 0.0
+        self.seconds = 0.0
+        self.subset_states = 0
+        self.largest_subset = 0
+        self.refinement_rounds = 0
+        self.transitions_added = 0
+        self.peak_memory = None  # type: Optional[int]
+
+        self._memory_start = 0
+        self._memory_peak = 0
+
+    def subset(self, size: int):
+        self.subset_states += 1
+        if size > self.largest_subset:
+            self.largest_subset = size
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'operation': self.operation,
+            'depth': self.depth,
+            'seconds': self.seconds,
+            'subset_states': self.subset_states,
+            'largest_subset': self.largest_subset,
+            'refinement_rounds': self.refinement_rounds,
+            'transitions_added': self.transitions_added,
+            'peak_memory': self.peak_memory,
+        }
+
+    def __repr__(self) -> str:
+        return '<OperationStats {} {:.6f}s>'.format(
+            self.operation, self.seconds)
+
+
+_listeners = []  # type: List[Callable[[OperationStats], None]]
+_running = []  # type: List[OperationStats]
+
+
+def current() -> Optional[OperationStats]:
+    """Retorna as estatísticas da operação em andamento mais interna, ou None
+    se nenhuma estiver sendo observada.
+    """
+    return _running[-1] if _running else None
+
+
+@contextmanager
+def observe(callback: Callable[[OperationStats], None]):
+    """Chama callback com as estatísticas de cada operação concluída dentro
+    de um bloco with.
+
+    Parâmetros:
+    callback -- função que recebe um OperationStats
+    """
+    _listeners.append(callback)
+
+    try:
+        yield
+    finally:
+        _listeners.remove(callback)
+
+
+@contextmanager
+def collecting(memory: bool = False):
+    """Retorna uma lista que recebe as estatísticas de cada operação
+    concluída dentro de um bloco with.
+
+    Parâmetros:
+    memory -- mede o pico de memória com tracemalloc (padrão False)
+    """
+    records = []  # type: List[OperationStats]
+    started = memory and not tracemalloc.is_tracing()
+
+    if started:
+        tracemalloc.start()
+
+    try:
+        with observe(records.append):
+            yield records
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def _memory_peak() -> int:
+    _, peak = tracemalloc.get_traced_memory()
+
+    # The peak is reset for every operation when possible (Python 3.9+), so
+    # operations that are still running keep the highest value seen so far.
+    for running in _running:
+        running._memory_peak = max(running._memory_peak, peak)
+
+    return peak
+
+
+def _start(operation: str) -> OperationStats:
+    stats = OperationStats(operation, depth=len(_running))
+
+    if tracemalloc.is_tracing():
+        _memory_peak()
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        stats._memory_start, _ = tracemalloc.get_traced_memory()
+
+    _running.append(stats)
+    stats.started_at = time.perf_counter()
+    return stats
+
+
+def _finish(stats: OperationStats):
+    stats.seconds = time.perf_counter() - stats.started_at
+
+    if tracemalloc.is_tracing():
+        _memory_peak()
+        stats.peak_memory = max(
+            0, stats._memory_peak - stats._memory_start)
+
+    _running.pop()
+
+    caller = current()
+    if caller is not None:
+        for counter in COUNTERS:
+            setattr(caller, counter,
+                    getattr(caller, counter) + getattr(stats, counter))
+        caller.largest_subset = max(
+            caller.largest_subset, stats.largest_subset)
+
+    for listener in list(_listeners):
+        listener(stats)
+
+
+def instrumented(operation):
+    """Decora uma operação para que as suas estatísticas sejam enviadas aos
+    observadores ativos, se houver algum.
+    """
+    @wraps(operation)
+    def wrapper(*args, **kwargs):
+        if not _listeners:
+            return operation(*args, **kwargs)
+
+        stats = _start(operation.__qualname__)
+
+        try:
+            return operation(*args, **kwargs)
+        finally:
+            _finish(stats)
+
+    return wrapper
@@ -1,7 +1,10 @@
 from pathlib import Path
 
 from kleeneup import FiniteAutomaton, RegularGrammar, Symbol
-from kleeneup.jayzon import dump, load
+from kleeneup.compact import CompactAutomaton, is_compact
+from kleeneup.compact import dump as dump_binary, dumps as dumps_binary
+from kleeneup.compact import load as load_binary
+from kleeneup.jayzon import iterdump, iterload
 
 
 class FileNotFound(Exception):
@@ -20,23 +23,53 @@ def find_file(filename: str, ext: str) -> Path:
     raise FileNotFound('{} does not exist'.format(filename))
 
 
+def is_compact_file(path: Path) -> bool:
+    with path.open('rb') as f:
+        return is_compact(f)
+
+
+def compact_from_file(filename: str) -> CompactAutomaton:
+    path = find_file(filename, 'fa')
+
+    if not is_compact_file(path):
+        return CompactAutomaton(dumps_binary(fa_from_file(filename)))
+
+    return load_binary(path)
+
+
 def fa_from_file(filename: str) -> FiniteAutomaton:
-    with find_file(filename, 'fa').open() as f:
-        fa = load(f)
-
-        transitions = {
-            (t['previous_state'], Symbol(t['symbol'])): t['next_states']
-            for t in fa['transitions']
-        }
-
-        return FiniteAutomaton(
-            transitions,
-            fa['initial_state'],
-            fa['accept_states']
-        )
+    path = find_file(filename, 'fa')
+
+    if is_compact_file(path):
+        with load_binary(path) as cfa:
+            return cfa.to_finite_automaton()
+
+    with path.open() as f:
+        fa = FiniteAutomaton({}, None, ())
+
+        for key, value in iterload(f, stream_keys={'transitions'}):
+            if key == 'transitions':
+                symbol = Symbol(value['symbol'])
+
+                for next_state in value['next_states']:
+                    fa.add_transition(
+                        value['previous_state'], symbol, next_state)
 
+            elif key == 'initial_state':
+                fa.initial_state = value
 
-def fa_to_file(fa: FiniteAutomaton, filename: str):
+            elif key == 'accept_states':
+                fa.accept_states = set(value)
+
+        return fa
+
+
+def fa_to_file(
+        fa: FiniteAutomaton,
+        filename: str,
+        binary: bool = False,
+        compact: bool = False,
+):
     ext = '.fa'
 
     if not filename.endswith(ext):
@@ -44,17 +77,32 @@ def fa_to_file(fa: FiniteAutomaton, filename: str):
 
     path = Path(filename)
 
+    if binary:
+        with path.open('wb') as f:
+            dump_binary(fa, f)
+
+        return path
+
+    if fa.implicit_sink:
+        fa = fa.copy()
+        fa.materialize_sink()
+
     with path.open('w') as f:
-        fad = {
-            'initial_state': fa.initial_state,
-            'accept_states': fa.accept_states,
-            'transitions': [
-                {'previous_state': ps, 'symbol': sym, 'next_states': ns}
-                for (ps, sym), ns in fa.transitions.items()
-            ],
-        }
+        transitions = (
+            {'previous_state': ps, 'symbol': sym, 'next_states': ns}
+            for ps, t in fa._delta.items()
+            for sym, ns in t.items()
+        )
 
-        dump(fad, f)
+        iterdump(
+            [
+                ('initial_state', fa.initial_state),
+                ('accept_states', fa.accept_states),
+                ('transitions', transitions),
+            ],
+            f,
+            compact=compact,
+        )
 
     return path
 
@@ -0,0 +1,35 @@
+from random import Random
+
+from benchmarks.generators import adversarial_regex, random_dfa, random_nfa
+from benchmarks.runner import compare, run_benchmarks
+from benchmarks.suite import BY_NAME
+from kleeneup import RegularExpression
+
+
+def test_generators_are_seeded():
+    fa1 = random_nfa(Random(7), 10, 3, density=0.2, epsilon=0.1)
+    fa2 = random_nfa(Random(7), 10, 3, density=0.2, epsilon=0.1)
+    assert fa1.transitions == fa2.transitions
+    assert fa1.accept_states == fa2.accept_states
+
+    dfa = random_dfa(Random(7), 10, 3)
+    assert dfa.is_deterministic()
+    assert len(dfa.transitions) == 30
+
+
+def test_adversarial_regex():
+    fa = RegularExpression(adversarial_regex(2)).to_finite_automaton()
+    assert len(fa.determinize().minimize().states) == 8
+
+
+def test_run_and_compare():
+    results = run_benchmarks([BY_NAME['regex']], repeat=1, quick=True)
+    assert [r['benchmark'] for r in results['results']] == ['regex']
+    assert results['results'][0]['peak_bytes'] > 0
+
+    slower = {'results': [
+        dict(r, min_seconds=r['min_seconds'] * 2)
+        for r in results['results']
+    ]}
+    assert compare(results, results) == []
+    assert [r['metric'] for r in compare(results, slower)] == ['min_seconds']
@@ -0,0 +1,44 @@
+from kleeneup import FiniteAutomaton, Sentence, State, Symbol, cache
+
+
+def make_fa():
+    a, b = Symbol('a'), Symbol('b')
+    A, B = State('A'), State('B')
+
+    return FiniteAutomaton({(A, a): {A, B}, (A, b): {B}}, B, {B})
+
+
+def test_memory_cache():
+    with cache.caching(maxsize=4) as c:
+        d_fa = make_fa().determinize()
+        assert (c.hits, c.misses) == (0, 1)
+
+        again = make_fa().determinize()
+        assert (c.hits, c.misses) == (1, 1)
+
+        assert again is not d_fa
+        assert again.transitions == d_fa.transitions
+
+    assert cache.active() is None
+
+
+def test_disk_cache(tmp_path):
+    with cache.caching(directory=tmp_path):
+        u_fa = FiniteAutomaton.union_all([make_fa(), make_fa()])
+
+    with cache.caching(directory=tmp_path) as c:
+        again = FiniteAutomaton.union_all(iter([make_fa(), make_fa()]))
+        assert c.hits == 1
+
+    assert again.transitions == u_fa.transitions
+    assert again.evaluate(Sentence(''))
+
+
+def test_eviction(tmp_path):
+    c = cache.OperationCache(maxsize=1, directory=tmp_path, max_bytes=0)
+
+    c.put('a', make_fa())
+    c.put('b', make_fa())
+
+    assert list(c._memory) == ['b']
+    assert not list(tmp_path.glob('*.pickle'))
@@ -0,0 +1,49 @@
+from cleo import Application, CommandTester
+
+from kleeneup import RegularExpression, Sentence
+from kleeneup.cli.fa import FromWords, Union
+from kleeneup.util import fa_from_file, fa_to_file
+
+
+def test_union_positional_output(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fa_to_file(RegularExpression('a').to_finite_automaton(), 'a')
+    fa_to_file(RegularExpression('b').to_finite_automaton(), 'b')
+    fa_to_file(RegularExpression('c').to_finite_automaton(), 'c')
+
+    application = Application()
+    application.add(Union())
+    tester = CommandTester(application.find('fa:union'))
+
+    # Running it again must rewrite ab.fa, not read it as an input.
+    for _ in range(2):
+        tester.execute([('command', 'fa:union'), ('fa', ['a', 'b', 'ab'])])
+        fa = fa_from_file('ab')
+        assert fa.evaluate(Sentence('a')) and fa.evaluate(Sentence('b'))
+        assert not fa.evaluate(Sentence('c'))
+
+    fa_to_file(RegularExpression('c').to_finite_automaton(), 'ab')
+    tester.execute([('command', 'fa:union'), ('fa', ['a', 'b', 'ab'])])
+    assert not fa_from_file('ab').evaluate(Sentence('c'))
+
+    assert tester.execute([('command', 'fa:union'),
+                           ('fa', ['a', 'b', 'c', 'abc'])]) == 1
+
+    tester.execute([('command', 'fa:union'), ('fa', ['a', 'b', 'c']),
+                    ('--out', 'abc')])
+    assert fa_from_file('abc').evaluate(Sentence('c'))
+
+
+def test_words_skips_blank_lines(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'words.txt').write_text('\nab\nabc\nb\n\n')
+
+    application = Application()
+    application.add(FromWords())
+    tester = CommandTester(application.find('fa:words'))
+
+    tester.execute([('command', 'fa:words'), ('words', 'words.txt'),
+                    ('out', 'words')])
+    fa = fa_from_file('words')
+    assert fa.evaluate(Sentence('abc'))
+    assert not fa.evaluate(Sentence(''))
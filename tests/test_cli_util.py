@@ -0,0 +1,47 @@
+from kleeneup import FiniteAutomaton, State, Symbol
+from kleeneup.cli import util
+
+
+class FakeCommand:
+    def __init__(self):
+        self.lines = []
+
+    def line(self, text):
+        self.lines.append(text)
+
+
+def test_print_table():
+    a = Symbol('a')
+    Q0, Q1, Q2 = State('Q0'), State('Q1'), State('Q2')
+
+    fa = FiniteAutomaton({(Q0, a): [Q1], (Q1, a): [Q2]}, Q0, [Q2])
+    fa.complete()
+
+    cmd = FakeCommand()
+    util.print_table(cmd, fa)
+
+    assert cmd.lines == [
+        '+-----------+--------+',
+        '| K \\ Σ     | a      |',
+        '+-----------+--------+',
+        '|  ->Q0     | Q1     |',
+        '|    Q1     | Q2     |',
+        '|   *Q2     | Qerror |',
+        '|    Qerror | Qerror |',
+        '+-----------+--------+',
+    ]
+
+
+def test_print_summary_counts_sink():
+    a, b = Symbol('a'), Symbol('b')
+    Q0, Q1 = State('Q0'), State('Q1')
+
+    fa = FiniteAutomaton({(Q0, a): [Q1], (Q1, b): [Q1]}, Q0, [Q1])
+    fa.complete()
+
+    cmd = FakeCommand()
+    util.print_summary(cmd, fa)
+
+    assert 'States: 3' in cmd.lines
+    assert 'Accept states: 1' in cmd.lines
+    assert 'Transitions: 6' in cmd.lines
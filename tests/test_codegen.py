@@ -0,0 +1,36 @@
+import pytest
+
+from kleeneup import RegularExpression, Sentence, codegen
+
+
+@pytest.mark.parametrize('regex', [
+    '(a|b|c)*.a.(a|b)',  # complete
+    'a.b*.c|b.b',  # with a dead state
+])
+def test_matcher(regex):
+    fa = RegularExpression(regex).to_finite_automaton()
+    match = codegen.matcher(fa)
+
+    for sentence in ['', 'a', 'ab', 'abc', 'abbbc', 'bb', 'cab', 'caa',
+                     'aab', 'ax', 'AB', 'a b']:
+        expected = all(c in 'abc' for c in sentence) and fa.evaluate(
+            Sentence(sentence))
+        assert match(sentence) == expected, sentence
+
+
+def test_write(tmp_path):
+    fa = RegularExpression('a.b*').to_finite_automaton()
+    path = codegen.write(fa, str(tmp_path / 'matcher'), function='is_abs')
+
+    assert path.name == 'matcher.py'
+
+    source = path.read_text()
+    assert 'import' not in source
+
+    namespace = {}
+    exec(source, namespace)
+    assert namespace['is_abs']('abbb')
+    assert not namespace['is_abs']('ba')
+
+    with pytest.raises(ValueError):
+        codegen.generate(fa, function='not valid')
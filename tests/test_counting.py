@@ -0,0 +1,50 @@
+import pytest
+
+from kleeneup import RegularExpression, counting
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def backend(request, monkeypatch):
+    if request.param == 'python':
+        monkeypatch.setattr(counting, 'numpy', None)
+    elif counting.numpy is None:
+        pytest.skip('numpy is not installed')
+
+
+def test_count_by_length(backend):
+    fa = RegularExpression('a.(a|b)*|b.b').to_finite_automaton()
+    assert fa.count_by_length(5) == [0, 1, 3, 4, 8, 16]
+    assert fa.count_by_length(-1) == []
+
+
+def test_count_sentences(backend):
+    digits = RegularExpression(
+        '(0|1|2|3|4|5|6|7|8|9)*').to_finite_automaton()
+
+    assert digits.count_by_length(30)[30] == 10 ** 30
+    assert digits.count_sentences(100) == 10 ** 100
+    assert digits.count_sentences(5000) == 10 ** 5000
+
+    fibonacci = RegularExpression('(b|a.b)*').to_finite_automaton()
+    counts = fibonacci.count_by_length(100)
+    assert counts[:6] == [1, 1, 2, 3, 5, 8]
+    assert all(counts[n] == counts[n - 1] + counts[n - 2]
+               for n in range(2, 101))
+    assert fibonacci.count_sentences(100) == counts[100]
+
+
+def test_sample(backend):
+    fa = RegularExpression('a.(a|b)*|b.b').to_finite_automaton()
+
+    sentences = [str(s) for s in fa.sample(3, 4000, seed=7)]
+    assert sentences == [str(s) for s in fa.sample(3, 4000, seed=7)]
+
+    # The 4 sentences of length 3 are drawn about 1000 times each.
+    assert sorted(set(sentences)) == ['aaa', 'aab', 'aba', 'abb']
+    assert all(800 < sentences.count(s) < 1200 for s in set(sentences))
+
+    long = fa.sample(70, 3, seed=1)
+    assert all(len(s.symbols) == 70 and fa.evaluate(s) for s in long)
+
+    with pytest.raises(ValueError):
+        fa.sample(0, 1)
@@ -1,4 +1,7 @@
-from kleeneup import FiniteAutomaton, Sentence, State, Symbol
+import pytest
+
+from kleeneup import (FiniteAutomaton, Property, RegularExpression, Sentence,
+                      State, Symbol)
 
 
 def test_copy():
@@ -89,6 +92,17 @@ def test_complete():
 
     fa.complete()
 
+    assert fa.states == {A, B}
+    assert fa.evaluate(Sentence('ab'))
+    assert not fa.evaluate(Sentence('aba'))
+
+    fa.materialize_sink()
+
+    assert len(fa.states) == 3
+    assert len(fa.transitions) == 6
+    assert fa.evaluate(Sentence('ab'))
+    assert not fa.evaluate(Sentence('aba'))
+
 
 def test_negate():
     a = Symbol('a')
@@ -112,6 +126,14 @@ def test_negate():
     assert n_fa.evaluate(Sentence(''))
     assert n_fa.evaluate(Sentence('aaa'))
     assert not n_fa.evaluate(Sentence('ab'))
+    assert n_fa.evaluate(Sentence('abb'))
+    assert len(n_fa.states) == 2
+
+    nn_fa = n_fa.negate()
+
+    assert not nn_fa.evaluate(Sentence(''))
+    assert nn_fa.evaluate(Sentence('ab'))
+    assert not nn_fa.evaluate(Sentence('abb'))
 
 
 def test_remove_unreachable():
@@ -189,3 +211,285 @@ def test_minimize():
     fa = fa.minimize()
 
     assert len(fa.states) == 3
+
+
+def test_union_all():
+    a, b, c = Symbol('a'), Symbol('b'), Symbol('c')
+    A, B = State('A'), State('B')
+
+    fas = [
+        FiniteAutomaton({(A, symbol): {B}}, A, {B})
+        for symbol in (a, b, c)
+    ]
+    fas.append(FiniteAutomaton({}, A, {A}))
+
+    fa_union = FiniteAutomaton.union_all(fas)
+
+    assert fa_union.evaluate(Sentence(''))
+    assert fa_union.evaluate(Sentence('a'))
+    assert fa_union.evaluate(Sentence('b'))
+    assert fa_union.evaluate(Sentence('c'))
+    assert not fa_union.evaluate(Sentence('ab'))
+
+    assert FiniteAutomaton.union_all(fas, workers=2) == fa_union
+
+
+def test_concatenate_all():
+    a, b = Symbol('a'), Symbol('b')
+    A, B = State('A'), State('B')
+
+    fa_a = FiniteAutomaton({(A, a): {B}}, A, {B})
+    fa_b_opt = FiniteAutomaton({(A, b): {B}}, A, {A, B})
+
+    fa_concat = FiniteAutomaton.concatenate_all([fa_a, fa_b_opt, fa_a])
+
+    assert fa_concat.evaluate(Sentence('aa'))
+    assert fa_concat.evaluate(Sentence('aba'))
+    assert not fa_concat.evaluate(Sentence('a'))
+    assert not fa_concat.evaluate(Sentence('ab'))
+    assert not fa_concat.evaluate(Sentence('abba'))
+
+    fa_empty = FiniteAutomaton.concatenate_all([])
+    assert fa_empty.evaluate(Sentence(''))
+    assert not fa_empty.evaluate(Sentence('a'))
+
+
+def test_symbol_classes():
+    a, b, c, d = Symbol('a'), Symbol('b'), Symbol('c'), Symbol('d')
+    A, B = State('A'), State('B')
+
+    transitions = {
+        (A, a): {B},
+        (A, b): {B},
+        (A, c): {A},
+        (B, a): {A},
+        (B, b): {A},
+        (B, d): {A},
+    }
+
+    fa = FiniteAutomaton(transitions, A, {B})
+
+    assert fa.symbol_classes() == [
+        frozenset({a, b}),
+        frozenset({c}),
+        frozenset({d}),
+    ]
+
+    d_fa = fa.determinize()
+    assert d_fa.evaluate(Sentence('a'))
+    assert d_fa.evaluate(Sentence('cb'))
+    assert not d_fa.evaluate(Sentence('ab'))
+    assert d_fa.evaluate(Sentence('bdb'))
+
+
+def test_properties():
+    a, b = Symbol('a'), Symbol('b')
+    A, B = State('A'), State('B')
+
+    fa = FiniteAutomaton({(A, a): {A, B}, (A, b): {B}}, A, {B})
+    assert not fa.properties
+    assert not fa.is_deterministic()
+
+    d_fa = fa.determinize()
+    assert Property.DETERMINISTIC in d_fa.properties
+
+    m_fa = d_fa.minimize()
+    assert Property.MINIMAL in m_fa.properties
+    assert m_fa.determinize().properties >= {
+        Property.DETERMINISTIC, Property.MINIMAL}
+
+    n_fa = m_fa.negate()
+    assert Property.COMPLETE in n_fa.properties
+    assert Property.MINIMAL not in n_fa.properties
+
+    m_fa.add_transition(B, a, A)
+    assert Property.DETERMINISTIC in m_fa.properties
+    assert Property.MINIMAL not in m_fa.properties
+
+    m_fa.add_transition(B, a, B)
+    assert Property.DETERMINISTIC not in m_fa.properties
+
+
+def test_minimize_partial():
+    a, b = Symbol('a'), Symbol('b')
+    A, B, C, D = State('A'), State('B'), State('C'), State('D')
+
+    transitions = {
+        (A, a): {B},
+        (B, b): {C},
+        (C, a): {D},
+        (D, b): {C},
+    }
+
+    fa = FiniteAutomaton(transitions, A, [B, C, D])
+    m_fa = fa.minimize()
+
+    assert len(m_fa.states) == 3
+    assert m_fa.evaluate(Sentence('abab'))
+    assert not m_fa.evaluate(Sentence('aa'))
+
+
+def test_canonical_hash():
+    from kleeneup import RegularExpression
+
+    def h(expression):
+        return RegularExpression(expression).to_finite_automaton() \
+            .canonical_hash()
+
+    assert h('(a|b)*') == h('(a*.b*)*')
+    assert h('a.(b.a)*') == h('(a.b)*.a')
+    assert h('a*') != h('(a|b)*')
+
+    a = Symbol('a')
+    A, B = State('A'), State('B')
+    empty_1 = FiniteAutomaton({(A, a): {B}}, A, set())
+    empty_2 = FiniteAutomaton({}, B, set())
+
+    assert empty_1.canonical_hash() == empty_2.canonical_hash()
+    assert empty_1.canonical().states == {State('Q0')}
+
+
+def test_reset_state_names():
+    a, b = Symbol('a'), Symbol('b')
+    A, B, C = State('A'), State('B'), State('C')
+
+    fa = FiniteAutomaton({(A, b): {B}, (A, a): {C}, (C, a): {B}}, A, {B})
+    fa.reset_state_names()
+
+    assert fa.transitions == {
+        ('Q0', a): {'Q1'},
+        ('Q0', b): {'Q2'},
+        ('Q1', a): {'Q2'},
+    }
+
+
+def test_from_words():
+    words = ['', 'car', 'cars', 'cat', 'cats', 'dog', 'dogs']
+    fa = FiniteAutomaton.from_words(iter(words))
+
+    for word in words:
+        assert fa.evaluate(Sentence(word))
+
+    for word in ('ca', 'carss', 'do', 'dot', 's'):
+        assert not fa.evaluate(Sentence(word))
+
+    # Shared suffixes make the automaton smaller than the trie.
+    assert len(fa.states) == 7
+
+    expected = RegularExpression('&|c.a.(r|t).s?|d.o.g.s?')
+    assert fa == expected.to_finite_automaton()
+
+    with pytest.raises(ValueError):
+        FiniteAutomaton.from_words(['b', 'a'])
+
+
+def test_sentences():
+    fa = RegularExpression('a.b.c|a|b.b?').to_finite_automaton()
+
+    assert [str(s) for s in fa.sentences()] == ['a', 'b', 'bb', 'abc']
+    assert [str(s) for s in fa.sentences(3, min_length=2)] == ['bb', 'abc']
+    assert [str(s) for s in fa.gen_sentences(2)] == ['bb']
+
+    infinite = RegularExpression('(a|b)*.c').to_finite_automaton()
+    sentences = infinite.sentences()
+    assert [str(next(sentences)) for _ in range(5)] == [
+        'c', 'ac', 'bc', 'aac', 'abc']
+
+    a, e = Symbol('a'), Symbol('&')
+    A, B = State('A'), State('B')
+    epsilon = FiniteAutomaton({(A, e): {B}, (B, a): {B}}, A, [B])
+    assert [str(s) for s in epsilon.gen_sentences(2)] == ['aa']
+
+
+def test_is_subset():
+    ab = RegularExpression('a.b*').to_finite_automaton()
+    abc = RegularExpression('a.(b|c)*').to_finite_automaton()
+
+    assert ab.is_subset(abc)
+    assert not abc.is_subset(ab)
+    assert str(abc.inclusion_counterexample(ab)) == 'ac'
+    assert ab.inclusion_counterexample(abc) is None
+
+    # Equality checks inclusion in both directions.
+    assert ab != abc and abc != ab
+    assert ab == RegularExpression('a|a.b.b*').to_finite_automaton()
+
+
+def test_is_universal():
+    assert RegularExpression('(a|b)*').to_finite_automaton().is_universal()
+    assert not RegularExpression('(a.b)*').to_finite_automaton().is_universal()
+
+    fa = RegularExpression('a*.b.(a|b)*|a*').to_finite_automaton()
+    assert fa.is_universal()
+    assert not fa.is_universal([Symbol('a'), Symbol('b'), Symbol('c')])
+
+
+def test_is_empty():
+    A = State('A')
+    B = State('B')
+    a = Symbol('a')
+
+    assert FiniteAutomaton({(A, a): {B}}, A, set()).is_empty()
+    assert not FiniteAutomaton({(A, a): {B}}, A, {B}).is_empty()
+
+    fa = RegularExpression('a*').to_finite_automaton()
+    assert fa.negate().is_empty()
+    assert not fa.negate([a, Symbol('b')]).is_empty()
+
+    # Symbols added by the second complement were rejected before it.
+    fa = RegularExpression('a.a*').to_finite_automaton().negate()
+    assert fa.negate([a, Symbol('b')]).evaluate(Sentence('b'))
+
+
+def test_shortest_accepted():
+    fa = RegularExpression('c.c|b.a|b.b.a').to_finite_automaton()
+    assert fa.shortest_accepted() == Sentence('ba')
+    assert fa.negate().shortest_accepted() == Sentence('')
+
+    A = State('A')
+    B = State('B')
+    C = State('C')
+    a = Symbol('a')
+    epsilon = Symbol('&')
+
+    fa = FiniteAutomaton({(A, epsilon): {B}, (B, a): {C}}, A, {C})
+    assert fa.shortest_accepted() == Sentence('a')
+    assert FiniteAutomaton({(A, a): {B}}, A, {C}).shortest_accepted() is None
+
+
+def test_intersects():
+    fa1 = RegularExpression('a*.b').to_finite_automaton()
+    fa2 = RegularExpression('(a.a)*.b.b?').to_finite_automaton()
+    fa3 = RegularExpression('a.(a.a)*.b').to_finite_automaton()
+
+    assert fa1.intersects(fa2)
+    assert fa1.intersects(fa3)
+    assert not fa2.intersects(fa3)
+    assert fa2.intersects(fa3.negate())
+    assert not fa1.intersects(fa1.negate())
+
+
+def test_evaluate_epsilon():
+    a, b, epsilon = Symbol('a'), Symbol('b'), Symbol('&')
+    A, B, C = State('A'), State('B'), State('C')
+    fa = FiniteAutomaton({(A, epsilon): {B}, (B, a): {C}, (C, epsilon): {A}},
+                         A, {B})
+
+    assert fa.evaluate(Sentence(''))
+    assert fa.evaluate(Sentence('aa'))
+    assert not fa.evaluate(Sentence('b'))
+
+
+def test_intersection_all():
+    fa1 = RegularExpression('a*.b*').to_finite_automaton()
+    fa2 = RegularExpression('(a.a)*.b*').to_finite_automaton()
+    fa3 = RegularExpression('a*.b.b*').to_finite_automaton()
+
+    fa = FiniteAutomaton.intersection_all([fa1, fa2, fa3])
+    assert fa.is_deterministic()
+    assert fa == fa1.intersection(fa2).intersection(fa3)
+    assert fa.evaluate(Sentence('aab'))
+    assert not fa.evaluate(Sentence('ab'))
+    assert not fa.evaluate(Sentence('aa'))
+    assert FiniteAutomaton.intersection_all([fa2, fa3.negate()]).evaluate(
+        Sentence('aa'))
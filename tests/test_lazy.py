@@ -0,0 +1,73 @@
+from kleeneup import RegularExpression, Sentence, Symbol
+from kleeneup.lazy import lazy
+
+
+def regex(expression, name):
+    return lazy(RegularExpression(expression).to_finite_automaton(), name)
+
+
+def test_optimize():
+    a = regex('a*.b', 'a')
+    b = regex('(a.a)*.b.b?', 'b')
+    c = regex('a.(a.a)*.b', 'c')
+
+    assert repr(a.negate().negate().optimize()) == 'a'
+    assert repr(a.intersection(b).intersection(c).optimize()) == (
+        'inter(a, b, c)')
+    assert repr(a.difference(b).optimize()) == 'inter(a, neg(b))'
+    assert repr(a.negate().union(b).negate().optimize()) == (
+        'inter(a, neg(b))')
+    assert repr(a.union(b).concatenate(a.union(b)).optimize()) == (
+        'concat(union(a, b), union(a, b))')
+
+    shared = a.union(b).concatenate(a.union(b)).optimize()
+    assert shared.children[0] is shared.children[1]
+
+
+def test_negation_keeps_alphabet():
+    a = regex('a*', 'a')
+    b = regex('b', 'b')
+
+    # The outer complement is taken over {a, b}, so neg(neg(a)) is not a:
+    # it also accepts every sentence with a b.
+    expression = a.negate().negate([Symbol('b')])
+    assert repr(expression.optimize()) == 'neg(neg(a))'
+    assert expression.evaluate(Sentence('aa'))
+    assert expression.evaluate(Sentence('ba'))
+    assert expression.materialize().evaluate(Sentence('ba'))
+
+    fa = a.negate().negate().materialize()
+    assert fa.alphabet == {Symbol('a')}
+
+    assert a.union(b).negate().evaluate(Sentence('ab'))
+    assert not a.union(b).negate().evaluate(Sentence('c'))
+
+
+def test_materialize():
+    fa1 = RegularExpression('a*.b').to_finite_automaton()
+    fa2 = RegularExpression('(a.a)*.b.b?').to_finite_automaton()
+    fa3 = RegularExpression('b.a*').to_finite_automaton()
+
+    eager = fa1.union(fa3).negate().intersection(fa2).difference(fa1)
+    expression = lazy(fa1).union(fa3).negate().intersection(fa2).difference(
+        fa1)
+
+    fa = expression.materialize()
+    assert fa == eager
+    assert fa.alphabet == eager.alphabet
+
+    for sentence in ('', 'b', 'bb', 'aab', 'aabb', 'ba', 'abb'):
+        assert (expression.evaluate(Sentence(sentence)) ==
+                eager.evaluate(Sentence(sentence)))
+
+
+def test_save(tmp_path):
+    from kleeneup.util import fa_from_file
+
+    a = regex('a*.b', 'a')
+    path = str(tmp_path / 'result.fa')
+    a.intersection(regex('a.a.b', 'b')).save(path)
+
+    fa = fa_from_file(path)
+    assert fa.evaluate(Sentence('aab'))
+    assert not fa.evaluate(Sentence('ab'))
@@ -0,0 +1,50 @@
+from random import Random
+
+import pytest
+
+from kleeneup import FiniteAutomaton, RegularExpression, State, Symbol
+from kleeneup.finite_automaton import REDUCTION_THRESHOLD
+
+
+def random_nfa(seed, n=40):
+    # Nondeterministic automaton with more than REDUCTION_THRESHOLD states
+    # whose subset construction does not blow up, so determinize() does not
+    # reduce it.
+    rng = Random(seed)
+    transitions = {}
+    for i in range(n):
+        for symbol in (Symbol('a'), Symbol('b')):
+            if rng.random() < 0.6:
+                k = 2 if rng.random() < 0.3 else 1
+                transitions[(State('q{}'.format(i)), symbol)] = {
+                    State('q{}'.format(int(rng.random() * n)))
+                    for _ in range(k)
+                }
+
+    accept_states = {
+        State('q{}'.format(i)) for i in range(n) if rng.random() < 0.3}
+    return FiniteAutomaton(transitions, State('q0'), accept_states)
+
+
+def test_determinize_workers():
+    part = RegularExpression('(a|b)*.a.(a|b).(a|b)').to_finite_automaton()
+    fa = FiniteAutomaton.concatenate_all([part] * 2).kleene_star()
+
+    expected = fa.determinize()
+
+    for workers in (2, 3):
+        parallel = fa.determinize(workers=workers)
+        assert parallel.transitions == expected.transitions
+        assert parallel.accept_states == expected.accept_states
+
+    # Large automata are reduced by every construction under the same rule.
+    fa = random_nfa(26)
+    assert len(fa.states) > REDUCTION_THRESHOLD
+
+    expected = fa.determinize()
+    parallel = fa.determinize(workers=2)
+    assert parallel.transitions == expected.transitions
+    assert parallel.accept_states == expected.accept_states
+
+    with pytest.raises(ValueError):
+        fa.determinize(workers=2, memory_limit=0)
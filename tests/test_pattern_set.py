@@ -0,0 +1,29 @@
+from kleeneup import PatternSet, RegularExpression
+
+
+def test_matches():
+    patterns = PatternSet([
+        RegularExpression('a.b*'),
+        RegularExpression('a*'),
+        RegularExpression('b.a'),
+    ])
+
+    assert patterns.matches('a') == [0, 1]
+    assert patterns.matches('abb') == [0]
+    assert patterns.matches('aaa') == [1]
+    assert patterns.matches('ba') == [2]
+    assert patterns.matches('') == [1]
+    assert patterns.matches('c') == []
+
+
+def test_add_incrementally():
+    patterns = PatternSet()
+    assert patterns.matches('ab') == []
+
+    first = patterns.add(RegularExpression('a.b'))
+    assert patterns.matches('ab') == [first]
+
+    second = patterns.add(RegularExpression('(a|b)*'))
+    assert patterns.matches('ab') == [first, second]
+    assert patterns.match_bitset('ab') == 0b11
+    assert len(patterns) == 2
@@ -0,0 +1,47 @@
+import pytest
+
+from kleeneup import RegularExpression, Sentence
+from kleeneup.pipeline import Pipeline, PipelineError, parse, plan
+
+
+def test_plan():
+    def planned(expression):
+        return repr(plan(parse(expression)))
+
+    assert planned('union(a, union(b.fa, c))') == 'union(a, b.fa, c)'
+    assert planned('det(min(a))') == 'min(det(a))'
+    assert planned('minimize(min(a))') == 'min(det(a))'
+    assert planned('min(inter(a, b))') == 'min(inter(a, b))'
+    assert planned('inter(a, and(b, c))') == 'inter(a, b, c)'
+    assert planned('neg(not(a))') == 'a'
+    assert planned('rev(rev(star(star(a))))') == 'star(a)'
+
+
+def test_parse_errors():
+    for expression in ('foo(a)', 'min(a, b)', 'union()', 'min(a'):
+        with pytest.raises(PipelineError):
+            parse(expression)
+
+
+def test_run():
+    automata = {
+        'ab': RegularExpression('a.b*').to_finite_automaton(),
+        'ba': RegularExpression('b*.a').to_finite_automaton(),
+    }
+    loaded = []
+
+    def loader(path):
+        loaded.append(path)
+        return automata[path]
+
+    pipeline = Pipeline('min(union(ab, ba, "c", inter(ab, ba)))')
+    fa = pipeline.run(loader)
+
+    assert sorted(loaded) == ['ab', 'ba']
+    assert fa.is_deterministic()
+
+    expected = RegularExpression('a.b*|b*.a|c').to_finite_automaton()
+    assert fa == expected
+
+    for sentence in ('a', 'abb', 'bba', 'c'):
+        assert fa.evaluate(Sentence(sentence))
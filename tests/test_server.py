@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+
+from kleeneup import RegularExpression, Sentence
+from kleeneup import server as server_module
+from kleeneup.server import Server
+
+
+def test_server(tmp_path):
+    path = str(tmp_path / 'kleeneup.sock')
+    server = Server(path, workers=1)
+
+    async def session():
+        await server.start()
+
+        reader, writer = await asyncio.open_unix_connection(path)
+
+        async def request(**fields):
+            writer.write(json.dumps(fields).encode('utf-8') + b'\n')
+            await writer.drain()
+            return json.loads((await reader.readline()).decode('utf-8'))
+
+        try:
+            compiled = await request(id=1, op='compile', name='ab',
+                                     regex='a.b*')
+            evaluated = await request(id=2, op='evaluate', name='ab',
+                                      sentence='abb')
+            batch = await request(id=3, op='evaluate_batch', name='ab',
+                                  sentences=['a', 'b', 'ab', 'aa'])
+            ran = await request(id=4, op='run', expression='min(neg(ab))',
+                                into='not_ab')
+            negated = await request(id=5, op='evaluate', name='not_ab',
+                                    sentence='b')
+            listed = await request(id=6, op='list')
+            unloaded = await request(id=7, op='unload', name='ab')
+            missing = await request(id=8, op='evaluate', name='ab',
+                                    sentence='a')
+            unknown = await request(op='explode')
+        finally:
+            writer.close()
+            await server.close()
+
+        return (compiled, evaluated, batch, ran, negated, listed, unloaded,
+                missing, unknown)
+
+    loop = asyncio.new_event_loop()
+    try:
+        (compiled, evaluated, batch, ran, negated, listed, unloaded, missing,
+         unknown) = loop.run_until_complete(session())
+    finally:
+        loop.close()
+
+    assert compiled['id'] == 1 and compiled['ok']
+    assert evaluated == {'id': 2, 'ok': True, 'result': True}
+    assert batch['result'] == [True, False, True, False]
+    assert ran['ok'] and ran['result']['deterministic']
+    assert negated['result'] is True
+    assert [fa['name'] for fa in listed['result']] == ['ab', 'not_ab']
+    assert unloaded['ok']
+    assert not missing['ok'] and 'ab' in missing['error']
+    assert not unknown['ok'] and 'id' not in unknown
+
+
+def test_keeps_other_files(tmp_path):
+    path = tmp_path / 'automaton.fa'
+    path.write_text('not a socket')
+    server = Server(str(path), workers=1)
+
+    loop = asyncio.new_event_loop()
+    try:
+        with pytest.raises(FileExistsError):
+            loop.run_until_complete(server.start())
+        loop.run_until_complete(server.close())
+    finally:
+        loop.close()
+
+    assert path.read_text() == 'not a socket'
+
+
+def test_run_large_in_server(tmp_path, monkeypatch):
+    monkeypatch.setattr(server_module, 'RUN_IN_SERVER_STATES', 0)
+    server = Server(str(tmp_path / 'kleeneup.sock'), workers=1)
+    server.automata['ab'] = RegularExpression('a.b*').to_finite_automaton()
+
+    async def in_worker(function, *args):
+        raise AssertionError('automata were sent to a worker')
+
+    monkeypatch.setattr(server, '_in_worker', in_worker)
+
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(
+            server.run({'expression': 'min(neg(ab))', 'into': 'not_ab'}))
+    finally:
+        loop.close()
+
+    assert result['deterministic']
+    assert server.automata['not_ab'].evaluate(Sentence('b'))
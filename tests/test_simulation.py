@@ -0,0 +1,52 @@
+from kleeneup import (FiniteAutomaton, RegularExpression, State, Symbol,
+                      finite_automaton)
+from kleeneup.simulation import simulation
+
+
+def test_simulation():
+    A = State('A')
+    B = State('B')
+    C = State('C')
+    D = State('D')
+    a = Symbol('a')
+    b = Symbol('b')
+
+    # B only reads a; C reads a or b, so C simulates B but not the reverse.
+    delta = {
+        A: {a: {B, C}},
+        B: {a: {D}},
+        C: {a: {D}, b: {D}},
+    }
+    sim = simulation(delta, {A, B, C, D}, {D})
+
+    assert sim[B] == {B, C}
+    assert sim[C] == {C}
+    assert sim[D] == {D}
+    assert A in sim[A] and D not in sim[A]
+
+
+def test_reduce():
+    part = RegularExpression('(a|b)*.a.(a|b).(a|b)').to_finite_automaton()
+    fa = FiniteAutomaton.concatenate_all([part] * 3).kleene_star()
+
+    reduced = fa.reduce()
+    assert len(reduced.states) < len(fa.states)
+    assert reduced == fa
+
+    empty = FiniteAutomaton({(State('A'), Symbol('a')): {State('B')}},
+                            State('A'), set())
+    assert empty.reduce().states == {State('A')}
+
+
+def test_determinize_reduces(monkeypatch):
+    part = RegularExpression('(a|b)*.a.(a|b).(a|b)').to_finite_automaton()
+    fa = FiniteAutomaton.concatenate_all([part] * 3).kleene_star()
+
+    monkeypatch.setattr(finite_automaton, 'REDUCTION_THRESHOLD', 10 ** 9)
+    plain = fa.determinize()
+
+    monkeypatch.setattr(finite_automaton, 'REDUCTION_THRESHOLD', 0)
+    reduced = fa.determinize()
+
+    assert len(reduced.states) < len(plain.states)
+    assert reduced == plain
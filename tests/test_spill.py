@@ -0,0 +1,86 @@
+from random import Random
+
+import pytest
+
+from kleeneup import FiniteAutomaton, State, Symbol, spill
+from kleeneup.finite_automaton import REDUCTION_THRESHOLD
+
+
+def random_nfa(seed, n=40):
+    # Nondeterministic automaton with more than REDUCTION_THRESHOLD states
+    # whose subset construction does not blow up, so determinize() does not
+    # reduce it.
+    rng = Random(seed)
+    transitions = {}
+    for i in range(n):
+        for symbol in (Symbol('a'), Symbol('b')):
+            if rng.random() < 0.6:
+                k = 2 if rng.random() < 0.3 else 1
+                transitions[(State('q{}'.format(i)), symbol)] = {
+                    State('q{}'.format(int(rng.random() * n)))
+                    for _ in range(k)
+                }
+
+    accept_states = {
+        State('q{}'.format(i)) for i in range(n) if rng.random() < 0.3}
+    return FiniteAutomaton(transitions, State('q0'), accept_states)
+
+
+def kth_from_last(k):
+    # Sentences whose k-th symbol from the end is an a: the deterministic
+    # automaton has 2^k states.
+    a = Symbol('a')
+    b = Symbol('b')
+    transitions = {
+        (State('q0'), a): {State('q0'), State('q1')},
+        (State('q0'), b): {State('q0')},
+    }
+    for i in range(1, k):
+        transitions[(State('q{}'.format(i)), a)] = {State('q{}'.format(i + 1))}
+        transitions[(State('q{}'.format(i)), b)] = {State('q{}'.format(i + 1))}
+
+    return FiniteAutomaton(transitions, State('q0'), {State('q{}'.format(k))})
+
+
+def test_memory_limit():
+    fa = kth_from_last(6)
+    expected = fa.determinize()
+
+    spilled = fa.determinize(memory_limit=0)
+    assert len(spilled.states) == 2 ** 6
+    assert spilled.transitions == expected.transitions
+    assert spilled.accept_states == expected.accept_states
+
+    fa = random_nfa(26)
+    assert len(fa.states) > REDUCTION_THRESHOLD
+
+    expected = fa.determinize()
+    spilled = fa.determinize(memory_limit=0)
+    assert spilled.transitions == expected.transitions
+    assert spilled.accept_states == expected.accept_states
+
+
+def test_checkpoint(tmp_path, monkeypatch):
+    fa = kth_from_last(8)
+    path = str(tmp_path / 'determinize.sqlite')
+
+    monkeypatch.setattr(spill, 'CHECKPOINT_INTERVAL', 10)
+    add_transition = spill._DiskStore.add_transition
+    calls = []
+
+    def interrupted(store, *args):
+        calls.append(args)
+        if len(calls) == 300:
+            raise KeyboardInterrupt()
+        add_transition(store, *args)
+
+    monkeypatch.setattr(spill._DiskStore, 'add_transition', interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        fa.determinize(checkpoint=path)
+
+    monkeypatch.setattr(spill._DiskStore, 'add_transition', add_transition)
+    resumed = fa.determinize(checkpoint=path)
+    assert resumed.transitions == fa.determinize().transitions
+
+    with pytest.raises(spill.CheckpointMismatch):
+        kth_from_last(3).determinize(checkpoint=path)
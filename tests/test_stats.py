@@ -0,0 +1,42 @@
+from kleeneup import RegularExpression, Symbol, stats
+
+
+def test_collecting():
+    fa = RegularExpression('(a|b)*.a.(a|b)').to_finite_automaton()
+    fa.add_transition(fa.initial_state, Symbol('a'), fa.initial_state)
+
+    with stats.collecting(memory=True) as records:
+        fa.determinize().minimize()
+
+    operations = [r.operation for r in records]
+    assert operations == [
+        'FiniteAutomaton.remove_epsilon_transitions',
+        'FiniteAutomaton.determinize',
+        'FiniteAutomaton.minimize',
+    ]
+
+    remove_epsilon, determinize, minimize = records
+    assert remove_epsilon.depth == 1
+    assert determinize.depth == minimize.depth == 0
+
+    assert determinize.subset_states == 4
+    assert determinize.largest_subset >= 2
+    assert determinize.transitions_added >= 8
+    assert minimize.refinement_rounds > 0
+    assert all(r.peak_memory is not None for r in records)
+
+    assert stats.current() is None
+
+
+def test_observe_without_memory():
+    fa = RegularExpression('a*').to_finite_automaton()
+    seen = []
+
+    with stats.observe(seen.append):
+        fa.kleene_star()
+
+    fa.kleene_star()
+
+    assert [r.operation for r in seen] == ['FiniteAutomaton.kleene_star']
+    assert seen[0].peak_memory is None
+    assert seen[0].seconds >= 0
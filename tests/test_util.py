@@ -1,5 +1,8 @@
-from kleeneup import FiniteAutomaton, RegularGrammar, State, Symbol
-from kleeneup.util import fa_from_file, fa_to_file, rg_from_file, rg_to_file
+from io import StringIO
+
+from kleeneup import FiniteAutomaton, jayzon, RegularGrammar, Sentence, State, Symbol
+from kleeneup.util import (compact_from_file, fa_from_file, fa_to_file,
+                           rg_from_file, rg_to_file)
 
 
 def test_fa_save_load():
@@ -32,6 +35,82 @@ def test_fa_save_load():
     path.unlink()
 
 
+def test_fa_save_load_compact(monkeypatch):
+    monkeypatch.setattr(jayzon, 'CHUNK_SIZE', 7)
+
+    a = Symbol('a')
+    b = Symbol('b')
+
+    Q0 = State('Q0')
+    Q1 = State('Q1')
+
+    fa = FiniteAutomaton(
+        {
+            (Q0, a): [Q0, Q1],
+            (Q1, b): [Q1],
+        },
+        Q0,
+        [Q1],
+    )
+
+    indented = fa_to_file(fa, 'test')
+    indented_size = indented.stat().st_size
+    compact = fa_to_file(fa, 'test', compact=True)
+
+    assert compact.stat().st_size < indented_size
+
+    new_fa = fa_from_file(str(compact))
+
+    assert new_fa.initial_state == fa.initial_state
+    assert new_fa.accept_states == fa.accept_states
+    assert new_fa.transitions == fa.transitions
+
+    compact.unlink()
+
+
+def test_iterload():
+    f = StringIO('{"n": 12345, "xs": [1, {"a": [2]}, "3"], "e": []}')
+
+    assert list(jayzon.iterload(f, stream_keys={'xs', 'e'})) == [
+        ('n', 12345),
+        ('xs', 1),
+        ('xs', {'a': [2]}),
+        ('xs', '3'),
+    ]
+
+
+def test_fa_save_load_binary():
+    a = Symbol('a')
+    b = Symbol('b')
+
+    Q0 = State('Q0')
+    Q1 = State('Q1')
+
+    fa = FiniteAutomaton(
+        {
+            (Q0, a): [Q0, Q1],
+            (Q1, b): [Q1],
+        },
+        Q0,
+        [Q1],
+    )
+    n_fa = fa.negate()
+
+    path = fa_to_file(n_fa, 'test', binary=True)
+
+    new_fa = fa_from_file(str(path))
+
+    assert new_fa.states == n_fa.states
+    assert new_fa.transitions == n_fa.transitions
+    assert new_fa.implicit_sink and new_fa.sink_accepting
+
+    with compact_from_file(str(path)) as cfa:
+        for sentence in ['', 'a', 'ab', 'abba', 'ba', 'aabb']:
+            assert cfa.evaluate(sentence) == n_fa.evaluate(Sentence(sentence))
+
+    path.unlink()
+
+
 def test_rg_save_load():
     rg = RegularGrammar.from_string('''
         S' -> aS | bS | &